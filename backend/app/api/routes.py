@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Query
 from pydantic import BaseModel, Field
 
-from app.services.team_generator import gerar_time
+from app.services.team_generator import gerar_time, gerar_times_alternativos
 from app.services.backtest_service import run_backtest
 from app.core.simple_cache import get as cache_get, set as cache_set
+from app.core.executor import executar, metricas
 
 router = APIRouter(prefix="/api")
 
@@ -11,16 +12,29 @@ class GerarTimeRequest(BaseModel):
     cartoletas: float = Field(..., ge=0, le=500)
     formacao: str = Field(..., min_length=3, max_length=5)
 
+class GerarTimesRequest(GerarTimeRequest):
+    n: int = Field(5, ge=1, le=20)
+    min_diferenca: int = Field(1, ge=1, le=11)
+
 @router.get("/health")
 def health():
     return {"status": "ok"}
 
+@router.get("/metrics/execucao")
+def metricas_execucao():
+    return metricas()
+
+# handlers pesados rodam no pool de processos (app.core.executor), não no threadpool do FastAPI
 @router.post("/gerar-time")
-def gerar_time_endpoint(body: GerarTimeRequest):
-    return gerar_time(body)
+async def gerar_time_endpoint(body: GerarTimeRequest):
+    return await executar("interativo", gerar_time, body)
+
+@router.post("/gerar-times")
+async def gerar_times_endpoint(body: GerarTimesRequest):
+    return await executar("interativo", gerar_times_alternativos, body)
 
 @router.get("/backtest/resumo")
-def backtest_resumo(
+async def backtest_resumo(
     cartoletas: float = Query(200.0, ge=0, le=500),
     formacao: str = Query("4-3-3"),
     top_k: int = Query(20, ge=5, le=100),
@@ -31,7 +45,9 @@ def backtest_resumo(
     if cached is not None:
         return cached
 
-    result = run_backtest(
+    result = await executar(
+        "batch",
+        run_backtest,
         cartoletas=float(cartoletas),
         formacao=formacao,
         top_k=int(top_k),
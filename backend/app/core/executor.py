@@ -0,0 +1,179 @@
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict
+
+from app.services.team_generator import aquecer
+
+# filas separadas: geração de time (interativa) não disputa worker com backtest (batch)
+# workers = processos no pool; max_fila = tarefas aguardando além das em execução
+FILAS: Dict[str, Dict[str, Any]] = {
+    "interativo": {
+        "workers": int(os.getenv("EXEC_INTERATIVO_WORKERS", "2")),
+        "max_fila": int(os.getenv("EXEC_INTERATIVO_FILA", "16")),
+        "initializer": aquecer,
+    },
+    "batch": {
+        "workers": int(os.getenv("EXEC_BATCH_WORKERS", "1")),
+        "max_fila": int(os.getenv("EXEC_BATCH_FILA", "2")),
+        "initializer": None,
+    },
+}
+
+_POOLS: Dict[str, ProcessPoolExecutor] = {}
+_STATS: Dict[str, Dict[str, float]] = {
+    nome: {"em_voo": 0, "concluidas": 0, "falhas": 0, "rejeitadas": 0, "latencia_media_s": 0.0}
+    for nome in FILAS
+}
+_LOCK = threading.Lock()
+
+# peso da última tarefa na média móvel de latência
+_EWMA_ALPHA = 0.2
+
+
+class FilaCheia(Exception):
+    def __init__(self, fila: str, retry_after: int):
+        super().__init__(f"Fila '{fila}' cheia, tente novamente em {retry_after}s")
+        self.fila = fila
+        self.retry_after = retry_after
+
+
+def _pool(fila: str) -> ProcessPoolExecutor:
+    with _LOCK:
+        pool = _POOLS.get(fila)
+        if pool is None:
+            cfg = FILAS[fila]
+            # spawn: o processo principal tem threads (uvicorn/aquecimento), fork não é seguro
+            pool = ProcessPoolExecutor(
+                max_workers=cfg["workers"],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=cfg["initializer"],
+            )
+            _POOLS[fila] = pool
+        return pool
+
+
+def _retry_after(fila: str) -> int:
+    cfg, st = FILAS[fila], _STATS[fila]
+    # tempo estimado para esvaziar a fila atual com os workers disponíveis
+    latencia = st["latencia_media_s"] or 1.0
+    espera = latencia * max(1, st["em_voo"] - cfg["workers"] + 1) / max(1, cfg["workers"])
+    return max(1, int(math.ceil(espera)))
+
+
+def _descartar(fila: str, pool: ProcessPoolExecutor):
+    # só remove se ainda for o pool da fila: outra requisição pode já ter
+    # subido um pool novo, que ficaria órfão (fora de encerrar/metricas)
+    if _POOLS.get(fila) is pool:
+        del _POOLS[fila]
+
+
+def _concluir(fila: str, pool: ProcessPoolExecutor, inicio: float, fut):
+    dur = time.monotonic() - inicio
+    with _LOCK:
+        st = _STATS[fila]
+        st["em_voo"] -= 1
+        if fut.cancelled() or fut.exception() is not None:
+            st["falhas"] += 1
+            # worker morreu (OOM etc.): descarta o pool para ser recriado na próxima tarefa
+            if not fut.cancelled() and isinstance(fut.exception(), BrokenProcessPool):
+                _descartar(fila, pool)
+            return
+        st["concluidas"] += 1
+        st["latencia_media_s"] = dur if st["concluidas"] == 1 else (
+            _EWMA_ALPHA * dur + (1 - _EWMA_ALPHA) * st["latencia_media_s"]
+        )
+
+
+async def executar(fila: str, fn: Callable, *args, **kwargs):
+    """
+    Executa fn no pool de processos da fila. Se já houver workers + max_fila
+    tarefas em voo, rejeita na hora com FilaCheia (vira 429 + Retry-After).
+    """
+    cfg = FILAS[fila]
+    with _LOCK:
+        st = _STATS[fila]
+        if st["em_voo"] >= cfg["workers"] + cfg["max_fila"]:
+            st["rejeitadas"] += 1
+            raise FilaCheia(fila, _retry_after(fila))
+        st["em_voo"] += 1
+
+    inicio = time.monotonic()
+    try:
+        pool = _pool(fila)
+        try:
+            fut = pool.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            # worker ocioso morto (OOM kill): sem future pendente, o _concluir
+            # nunca descartaria o pool; descarta aqui e tenta uma vez num novo
+            with _LOCK:
+                _descartar(fila, pool)
+            pool = _pool(fila)
+            fut = pool.submit(fn, *args, **kwargs)
+    except Exception:
+        with _LOCK:
+            _STATS[fila]["em_voo"] -= 1
+            _STATS[fila]["falhas"] += 1
+        raise
+
+    # contabiliza pelo future do pool: se o cliente desconectar, a tarefa
+    # continua ocupando o worker até terminar
+    fut.add_done_callback(lambda f: _concluir(fila, pool, inicio, f))
+    return await asyncio.wrap_future(fut)
+
+
+def metricas() -> Dict[str, Dict[str, Any]]:
+    out = {}
+    with _LOCK:
+        for nome, cfg in FILAS.items():
+            st = _STATS[nome]
+            em_execucao = min(st["em_voo"], cfg["workers"])
+            pool = _POOLS.get(nome)
+            out[nome] = {
+                "workers": cfg["workers"],
+                "pids": sorted((pool._processes or {}).keys()) if pool is not None else [],
+                "max_fila": cfg["max_fila"],
+                "em_execucao": int(em_execucao),
+                "na_fila": int(st["em_voo"] - em_execucao),
+                "concluidas": int(st["concluidas"]),
+                "falhas": int(st["falhas"]),
+                "rejeitadas": int(st["rejeitadas"]),
+                "latencia_media_ms": round(st["latencia_media_s"] * 1000, 1),
+            }
+    return out
+
+
+def iniciar():
+    """Sobe os pools no boot (o initializer da fila interativa aquece o índice em cada worker)."""
+    for nome, cfg in FILAS.items():
+        pool = _pool(nome)
+        for _ in range(cfg["workers"]):
+            pool.submit(_noop)
+
+
+def encerrar():
+    """
+    Derruba os pools sem esperar: tarefas na fila são canceladas e workers
+    ainda ocupados (ex.: backtest longo) são terminados, para não segurar o
+    shutdown do servidor.
+    """
+    with _LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        processos = list((pool._processes or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for p in processos:
+            if p.is_alive():
+                p.terminate()
+        for p in processos:
+            p.join(timeout=1)
+
+
+def _noop() -> int:
+    return os.getpid()
@@ -1,10 +1,22 @@
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.api.routes import router
+from app.core import executor
+from app.optimizer.optimizer import OrcamentoInsuficiente
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # pools sobem no boot; cada worker interativo carrega previsões + índice de orçamento
+    executor.iniciar()
+    yield
+    executor.encerrar()
 
-app = FastAPI(title="Cartola FC ML")
+app = FastAPI(title="Cartola FC ML", lifespan=lifespan)
 
 frontend_origin = os.getenv("FRONTEND_ORIGIN", "").strip()
 allow_all = os.getenv("ALLOW_ALL_ORIGINS", "0").strip() == "1"
@@ -25,4 +37,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(executor.FilaCheia)
+async def fila_cheia_handler(request: Request, exc: executor.FilaCheia):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "fila": exc.fila},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.exception_handler(OrcamentoInsuficiente)
+async def orcamento_insuficiente_handler(request: Request, exc: OrcamentoInsuficiente):
+    return JSONResponse(
+        status_code=422,
+        content={"detail": str(exc), "custo_minimo": exc.custo_minimo},
+    )
+
 app.include_router(router)
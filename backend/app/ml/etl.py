@@ -1,30 +1,44 @@
-import pandas as pd
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
 
 RAW_PATH = Path("data/raw")
 
+RENAME_MAP = {
+    "atletas.atleta_id": "atleta_id",
+    "atletas.nome": "nome",
+    "atletas.apelido": "apelido",
+    "atletas.slug": "slug",
+    "atletas.clube_id": "clube_id",
+    "atletas.clube.id.full.name": "clube_nome",
+    "atletas.posicao_id": "posicao_id",
+    "atletas.preco_num": "preco",
+    "atletas.pontos_num": "pontos",
+    "atletas.media_num": "media",
+    "atletas.variacao_num": "variacao",
+    "atletas.jogos_num": "jogos",
+}
+
+SCOUT_COLS = [
+    "DS","FC","FD","FS","G","SG","FF","CA","I","DE","GS",
+    "DP","A","FT","PC","V","PS","PP","CV"
+]
+
+# tipos usados na leitura em streaming (nomes já normalizados);
+# o restante é numérico float64
+ID_DTYPES = {"atleta_id": "Int64", "clube_id": "Int32", "posicao_id": "Int32"}
+STR_COLS = ["nome", "apelido", "slug", "clube_nome"]
+
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    rename_map = {
-        "atletas.atleta_id": "atleta_id",
-        "atletas.nome": "nome",
-        "atletas.apelido": "apelido",
-        "atletas.slug": "slug",
-        "atletas.clube_id": "clube_id",
-        "atletas.clube.id.full.name": "clube_nome",
-        "atletas.posicao_id": "posicao_id",
-        "atletas.preco_num": "preco",
-        "atletas.pontos_num": "pontos",
-        "atletas.media_num": "media",
-        "atletas.variacao_num": "variacao",
-        "atletas.jogos_num": "jogos",
-    }
-
-    scout_cols = [
-        "DS","FC","FD","FS","G","SG","FF","CA","I","DE","GS",
-        "DP","A","FT","PC","V","PS","PP","CV"
-    ]
+    rename_map = dict(RENAME_MAP)
 
-    for col in scout_cols:
+    for col in SCOUT_COLS:
         if col in df.columns:
             rename_map[col] = col
 
@@ -34,7 +48,18 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     df = df[[c for c in keep if c in df.columns]]
     return df
 
-def load_all_seasons():
+def load_all_seasons(streaming: Optional[bool] = None, n_threads: Optional[int] = None):
+    """
+    streaming=True (ou ETL_STREAMING=1) usa o caminho de memória limitada:
+    ver load_all_seasons_streaming. n_threads (ou ETL_THREADS) lê arquivos em paralelo.
+    """
+    if streaming is None:
+        streaming = os.getenv("ETL_STREAMING", "0").strip() == "1"
+    if streaming:
+        if n_threads is None:
+            n_threads = int(os.getenv("ETL_THREADS", "1"))
+        return load_all_seasons_streaming(n_threads=n_threads)
+
     dfs = []
 
     for season_dir in RAW_PATH.iterdir():
@@ -56,3 +81,114 @@ def load_all_seasons():
 
     data = pd.concat(dfs, ignore_index=True)
     return data
+
+# ---------------------------------------------------------------------------
+# ETL em streaming
+# ---------------------------------------------------------------------------
+
+def iter_round_files() -> Iterator[Tuple[int, int, Path]]:
+    """(season, rodada, caminho) em ordem temporal."""
+    for season_dir in sorted(RAW_PATH.iterdir()):
+        if not season_dir.is_dir():
+            continue
+
+        season = int(season_dir.name)
+
+        csvs = sorted(season_dir.glob("rodada-*.csv"), key=lambda p: int(p.stem.split("-")[1]))
+        for csv in csvs:
+            yield season, int(csv.stem.split("-")[1]), csv
+
+def _read_dtypes() -> Dict[str, str]:
+    # chaves com o nome cru do csv, já que o dtype é aplicado antes do rename
+    dtypes = {}
+    for raw, col in list(RENAME_MAP.items()) + [(c, c) for c in SCOUT_COLS]:
+        if col in ID_DTYPES:
+            dtypes[raw] = ID_DTYPES[col]
+        elif col in STR_COLS:
+            dtypes[raw] = "category"
+        else:
+            dtypes[raw] = "float64"
+    return dtypes
+
+_USECOLS = frozenset(RENAME_MAP) | frozenset(SCOUT_COLS)
+_DTYPES = _read_dtypes()
+
+def read_round(csv: Path, season: int, rodada: int) -> pd.DataFrame:
+    """Lê só as colunas que normalize_columns mantém, já tipadas."""
+    df = pd.read_csv(csv, usecols=lambda c: c in _USECOLS, dtype=_DTYPES)
+    df = normalize_columns(df)
+
+    df["season"] = np.full(len(df), season, dtype=np.int16)
+    df["rodada"] = np.full(len(df), rodada, dtype=np.int16)
+    return df
+
+def iter_rounds(n_threads: int = 1) -> Iterator[pd.DataFrame]:
+    """
+    Gera um DataFrame por arquivo de rodada, em ordem. Com n_threads > 1 lê em
+    paralelo mantendo no máximo 2 * n_threads arquivos em memória.
+    """
+    files = iter_round_files()
+
+    if n_threads <= 1:
+        for season, rodada, csv in files:
+            yield read_round(csv, season, rodada)
+        return
+
+    with ThreadPoolExecutor(max_workers=n_threads) as ex:
+        pendentes = deque()
+        for season, rodada, csv in files:
+            pendentes.append(ex.submit(read_round, csv, season, rodada))
+            if len(pendentes) >= 2 * n_threads:
+                yield pendentes.popleft().result()
+        while pendentes:
+            yield pendentes.popleft().result()
+
+def _concat_column(pedacos: List, tamanhos: List[int]):
+    dtype = next(p.dtype for p in pedacos if p is not None)
+
+    # rodadas sem a coluna (scout ausente) entram como NA do mesmo tipo
+    if isinstance(dtype, np.dtype):
+        return np.concatenate([
+            p if p is not None else np.full(n, np.nan, dtype=dtype)
+            for p, n in zip(pedacos, tamanhos)
+        ])
+
+    pedacos = [
+        p if p is not None else pd.Series([None] * n, dtype=dtype).array
+        for p, n in zip(pedacos, tamanhos)
+    ]
+    if isinstance(dtype, pd.CategoricalDtype):
+        return union_categoricals(pedacos)
+    return pd.concat([pd.Series(p, copy=False) for p in pedacos], ignore_index=True).array
+
+def load_all_seasons_streaming(n_threads: int = 1) -> pd.DataFrame:
+    """
+    Versão de memória limitada de load_all_seasons: projeta colunas na leitura,
+    tipa (ids inteiros, textos categóricos) e acumula cada rodada num buffer
+    colunar em pedaços. No final cada coluna é concatenada e liberada em
+    seguida, então o pico fica em ~dataset + 1 coluna, não 2x o dataset.
+    """
+    buffer: Dict[str, List] = {}
+    tamanhos: List[int] = []
+
+    for df in iter_rounds(n_threads=n_threads):
+        n = len(df)
+        for col in df.columns:
+            if col not in buffer:
+                buffer[col] = [None] * len(tamanhos)
+            s = df[col]
+            buffer[col].append(s.to_numpy() if isinstance(s.dtype, np.dtype) else s.array)
+        for col in buffer:
+            if col not in df.columns:
+                buffer[col].append(None)
+        tamanhos.append(n)
+        del df
+
+    if not tamanhos:
+        raise ValueError(f"Nenhum arquivo rodada-*.csv encontrado em {RAW_PATH}")
+
+    colunas = {}
+    for col in list(buffer):
+        colunas[col] = _concat_column(buffer.pop(col), tamanhos)
+
+    return pd.DataFrame(colunas, copy=False)
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+CACHE_PATH = Path(os.getenv("MODEL_CACHE_DIR", "models/cache"))
+
+# uma floresta de 300 árvores ocupa ~11MB comprimida com 1.4k linhas de treino
+# e ~300MB numa janela de temporada inteira; o backtest de uma temporada soma ~6GB
+MAX_MB = float(os.getenv("MODEL_CACHE_MAX_MB", "8192"))
+
+# joblib com zlib nível 3: ~3.5x menor que o pickle cru, carga ~2x mais lenta
+COMPRESSAO = 3
+
+# segmento de entrada (LRU): todo modelo novo entra aqui, mesmo com o cache
+# cheio; guarda sempre pelo menos o mais recente (a janela nova que o
+# train_real e o próximo backtest incremental vão pedir)
+ENTRADA_FRACAO = 0.1
+
+# segmento principal: só recebe quem sai da entrada com mais acessos que as vítimas
+PRINCIPAL_DIR = "principal"
+
+# contagem de acessos por chave (inclui modelos já removidos do disco)
+ACESSOS_ARQUIVO = "acessos.json"
+
+# quando a soma das contagens passa disso, todas caem à metade e as zeradas
+# saem do arquivo (envelhecimento; limita o arquivo a AMOSTRA chaves)
+AMOSTRA = 2048
+
+
+def _hash_linhas(X: pd.DataFrame, y: pd.Series) -> np.ndarray:
+    frame = X.reset_index(drop=True).assign(__y__=np.asarray(y, dtype=float))
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def _fingerprint(row_hash: np.ndarray) -> str:
+    return f"{len(row_hash)}:{int(row_hash.sum(dtype=np.uint64))}"
+
+
+def data_fingerprint(X: pd.DataFrame, y: pd.Series) -> str:
+    """
+    Hash do conteúdo de treino (X + y). Soma dos hashes de linha: não depende da
+    ordem das linhas, então o mesmo recorte vindo do backtest (merge) ou do
+    train_real (filtro) gera a mesma chave. Isso só vale porque get_or_fit
+    treina sempre na ordem canônica (o bootstrap da floresta depende da ordem).
+    """
+    return _fingerprint(_hash_linhas(X, y))
+
+
+def model_key(features: List[str], params: Dict, janela: Tuple[int, int], fingerprint: str) -> str:
+    """janela = (season, rodada) da primeira rodada FORA do treino."""
+    raw = json.dumps({
+        "features": list(features),
+        "params": params,
+        "janela": [int(janela[0]), int(janela[1])],
+        "data": fingerprint,
+    }, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _path(key: str) -> Path:
+    return CACHE_PATH / f"{key}.joblib"
+
+
+def _path_principal(key: str) -> Path:
+    return CACHE_PATH / PRINCIPAL_DIR / f"{key}.joblib"
+
+
+def _ler_acessos() -> Dict[str, int]:
+    try:
+        with open(CACHE_PATH / ACESSOS_ARQUIVO, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _contar_acesso(key: str) -> Dict[str, int]:
+    acessos = _ler_acessos()
+    acessos[key] = acessos.get(key, 0) + 1
+
+    # contagens antigas não podem segurar o cache para sempre
+    if sum(acessos.values()) > AMOSTRA:
+        acessos = {k: v // 2 for k, v in acessos.items() if v // 2 > 0}
+
+    try:
+        CACHE_PATH.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_PATH / f"{ACESSOS_ARQUIVO}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(acessos, f)
+        os.replace(tmp, CACHE_PATH / ACESSOS_ARQUIVO)
+    except OSError:
+        pass
+    return acessos
+
+
+def _arquivos(pasta: Path) -> List[Tuple[float, int, Path]]:
+    out = []
+    for q in pasta.glob("*.joblib"):
+        try:
+            st = q.stat()
+        except OSError:
+            continue
+        out.append((st.st_mtime, st.st_size, q))
+    return out
+
+
+def _promover(q: Path, tamanho: int, principal: List, limite: float, acessos: Dict[str, int]) -> bool:
+    """
+    Admissão por frequência (estilo TinyLFU) no segmento principal: quem sai da
+    entrada só fica se couber removendo modelos com menos acessos que ele. Uma
+    varredura maior que o cache (walk-forward inteiro) não expulsa as janelas
+    que a próxima varredura vai pedir, como aconteceria com LRU puro.
+    """
+    falta = sum(a[1] for a in principal) + tamanho - limite
+    vitimas = []
+    # menos acessados primeiro; empate -> uso mais antigo
+    for a in sorted(principal, key=lambda a: (acessos.get(a[2].stem, 0), a[0])):
+        if falta <= 0:
+            break
+        if acessos.get(a[2].stem, 0) >= acessos.get(q.stem, 0):
+            return False
+        vitimas.append(a)
+        falta -= a[1]
+
+    if falta > 0:
+        return False
+
+    for a in vitimas:
+        a[2].unlink(missing_ok=True)
+        principal.remove(a)
+    destino = CACHE_PATH / PRINCIPAL_DIR / q.name
+    os.replace(q, destino)
+    principal.append((destino.stat().st_mtime, tamanho, destino))
+    return True
+
+
+def _admitir(tmp: Path, p: Path, acessos: Dict[str, int]) -> bool:
+    """
+    W-TinyLFU simplificado em dois segmentos no disco: o modelo novo sempre
+    entra na entrada (LRU, ENTRADA_FRACAO do limite); os que excedem a entrada
+    disputam vaga no principal por frequência ou são descartados. Sem a
+    entrada, uma janela nova nunca alcançaria a contagem das residentes.
+    """
+    limite = MAX_MB * 1024 * 1024
+    if tmp.stat().st_size > limite:
+        return False
+    os.replace(tmp, p)
+    (CACHE_PATH / PRINCIPAL_DIR).mkdir(exist_ok=True)
+
+    # entrada do mais recente para o mais antigo; o recém-gravado fica sempre
+    entrada = sorted(_arquivos(CACHE_PATH), key=lambda a: a[0], reverse=True)
+    ocupado = sum(a[1] for a in entrada if a[2] == p)
+    saem = []
+    for a in entrada:
+        if a[2] == p:
+            continue
+        if saem or ocupado + a[1] > limite * ENTRADA_FRACAO:
+            saem.append(a)
+        else:
+            ocupado += a[1]
+
+    principal = _arquivos(CACHE_PATH / PRINCIPAL_DIR)
+    limite_principal = limite - ocupado
+
+    # a entrada pode ter crescido: o principal cede espaço (menos acessados primeiro)
+    excesso = sum(a[1] for a in principal) - limite_principal
+    for a in sorted(principal, key=lambda a: (acessos.get(a[2].stem, 0), a[0])):
+        if excesso <= 0:
+            break
+        a[2].unlink(missing_ok=True)
+        principal.remove(a)
+        excesso -= a[1]
+
+    # os mais antigos da entrada disputam primeiro
+    for _, tamanho, q in reversed(saem):
+        if not _promover(q, tamanho, principal, limite_principal, acessos):
+            q.unlink(missing_ok=True)
+    return True
+
+
+def get_or_fit(
+    make_model: Callable,
+    X: pd.DataFrame,
+    y: pd.Series,
+    params: Dict,
+    janela: Tuple[int, int],
+):
+    """
+    Devolve o modelo treinado para (features, params, janela, dados), carregando
+    do cache em disco quando existir (joblib comprimido). O treino usa as linhas
+    em ordem canônica (pelo hash de cada linha), então a mesma chave sempre
+    corresponde ao mesmo modelo, venha o recorte em que ordem vier.
+    """
+    row_hash = _hash_linhas(X, y)
+    key = model_key(list(X.columns), params, janela, _fingerprint(row_hash))
+    p = _path(key)
+    acessos = _contar_acesso(key)
+
+    for q in (_path_principal(key), p):
+        if not q.exists():
+            continue
+        try:
+            model = joblib.load(q)
+        except Exception:
+            # arquivo truncado/incompatível: descarta e treina de novo
+            q.unlink(missing_ok=True)
+        else:
+            # marca uso recente (ordem LRU da entrada, desempate da remoção);
+            # falha aqui não invalida o modelo
+            try:
+                os.utime(q)
+            except OSError:
+                pass
+            return model
+
+    ordem = np.argsort(row_hash, kind="stable")
+    model = make_model()
+    model.fit(X.iloc[ordem], np.asarray(y)[ordem])
+
+    CACHE_PATH.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(f".{os.getpid()}.tmp")
+    joblib.dump(model, tmp, compress=COMPRESSAO)
+    if not _admitir(tmp, p, acessos):
+        tmp.unlink(missing_ok=True)
+
+    return model
@@ -1,8 +1,11 @@
 import joblib
+import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error
 from app.ml.etl import load_all_seasons
 from app.ml.features import add_features
+from app.ml.model_cache import get_or_fit
+from app.services.team_generator import precalcular_indices
 
 BASE_FEATURES = ["media_5", "std_5", "preco"]
 
@@ -11,12 +14,17 @@ SCOUT_FEATURES = [
     "DS_media_5","FF_media_5","FS_media_5"
 ]
 
+MODEL_PARAMS = {"n_estimators": 300, "random_state": 42}
+
 def train():
     df = load_all_seasons()
     df = add_features(df)
 
     features = BASE_FEATURES + [f for f in SCOUT_FEATURES if f in df.columns]
 
+    # mesma limpeza do backtest e da inferência (gerar_time)
+    df[features] = df[features].replace([np.inf, -np.inf], np.nan).fillna(0)
+
     # validação temporal (última rodada global)
     last_season = df["season"].max()
     last_round = df[df["season"] == last_season]["rodada"].max()
@@ -30,14 +38,15 @@ def train():
     X_test = test_df[features]
     y_test = test_df["target"]
 
-    model = RandomForestRegressor(
-        n_estimators=300,
-        random_state=42,
-        n_jobs=-1
+    # janela igual à última rodada do backtest: reaproveita o modelo se já existir
+    model = get_or_fit(
+        lambda: RandomForestRegressor(**MODEL_PARAMS, n_jobs=-1),
+        X_train,
+        y_train,
+        MODEL_PARAMS,
+        (last_season, last_round),
     )
 
-    model.fit(X_train, y_train)
-
     preds = model.predict(X_test)
     mae = mean_absolute_error(y_test, preds)
 
@@ -49,5 +58,8 @@ def train():
     test_df["pred"] = preds
     test_df.to_csv("data/processed/ultima_rodada.csv", index=False)
 
+    # índice de orçamento calculado uma vez aqui; os workers da API só carregam
+    print(f"Índice de orçamento: {precalcular_indices()}")
+
 if __name__ == "__main__":
     train()
@@ -0,0 +1,90 @@
+import bisect
+import json
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+
+import pulp
+import pandas as pd
+
+from app.optimizer.optimizer import FORMACOES, OrcamentoInsuficiente, ensure_pos, reduzir_candidatos, montar_problema
+
+CARTOLETAS_MAX = 500.0
+
+# preços do Cartola têm 2 casas decimais: o próximo orçamento relevante
+# abaixo de um custo c é c - 0.01
+PASSO = 0.01
+
+def build_budget_index(jogadores: pd.DataFrame, formacao: str, cartoletas_max: float = CARTOLETAS_MAX) -> Dict:
+    """
+    A escalação ótima é constante por partes no orçamento. Resolve em
+    cartoletas_max, obtém o custo c da solução (ótima para todo orçamento
+    em [c, cartoletas_max]) e repete em c - PASSO até ficar inviável.
+
+    Retorna {"formacao", "custos": [...crescente], "atletas": [[atleta_id, ...], ...]}.
+    """
+    if formacao not in FORMACOES:
+        raise ValueError(f"Formação inválida: {formacao}. Use uma de: {list(FORMACOES.keys())}")
+
+    jogadores = reduzir_candidatos(ensure_pos(jogadores), formacao, n=1)
+
+    prob, x, idx = montar_problema(jogadores, cartoletas_max, formacao)
+    orcamento = prob.constraints["orcamento"]
+    solver = pulp.PULP_CBC_CMD(msg=False)
+
+    custos = []
+    atletas = []
+
+    cartoletas = float(cartoletas_max)
+    while cartoletas >= 0:
+        # só o lado direito da restrição de orçamento muda entre as resoluções
+        orcamento.changeRHS(cartoletas)
+        prob.solve(solver)
+        if pulp.LpStatus[prob.status] != "Optimal":
+            break
+
+        chosen_idx = [i for i in idx if (x[i].value() or 0) > 0.5]
+        tit = jogadores.loc[chosen_idx].copy()
+        custo = round(float(tit["preco"].sum()), 2)
+
+        custos.append(custo)
+        atletas.append(sorted(int(a) for a in tit["atleta_id"]))
+
+        cartoletas = round(custo - PASSO, 2)
+
+    custos.reverse()
+    atletas.reverse()
+
+    return {"formacao": formacao, "custos": custos, "atletas": atletas}
+
+def build_all_indexes(jogadores: pd.DataFrame, cartoletas_max: float = CARTOLETAS_MAX) -> Dict[str, Dict]:
+    return {f: build_budget_index(jogadores, f, cartoletas_max) for f in FORMACOES}
+
+def salvar_indices(path: str, assinatura: str, indices: Dict[str, Dict]):
+    """
+    Grava os índices em JSON (custos + atleta_id por faixa) junto com a
+    assinatura das previsões usadas; escrita atômica (tmp + replace).
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"assinatura": assinatura, "indices": indices}, f)
+    os.replace(tmp, path)
+
+def carregar_indices(path: str) -> Tuple[Optional[str], Dict[str, Dict]]:
+    with open(path) as f:
+        data = json.load(f)
+    return data.get("assinatura"), data.get("indices", {})
+
+def lookup_titulares(index: Dict, jogadores: pd.DataFrame, cartoletas: float) -> pd.DataFrame:
+    """
+    Busca binária: a escalação ótima para `cartoletas` é a do maior custo <= cartoletas.
+    Orçamento abaixo do time mais barato -> OrcamentoInsuficiente.
+    """
+    custos: List[float] = index["custos"]
+    # trunca em centavos (99.999 não compra um time de 100.00)
+    cartoletas = math.floor(float(cartoletas) * 100 + 1e-6) / 100
+    pos = bisect.bisect_right(custos, cartoletas) - 1
+    if pos < 0:
+        raise OrcamentoInsuficiente(cartoletas, custos[0] if custos else float("inf"))
+    return jogadores[jogadores["atleta_id"].isin(index["atletas"][pos])].copy()
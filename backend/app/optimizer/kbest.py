@@ -0,0 +1,215 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# teto de combinações materializadas por rodada de enumeração (~90MB com
+# 11 posições int32 por linha); acima disso quem chama completa no MIP com
+# cortes (min_diferenca alto com orçamento apertado, faixa larga demais)
+LIMITE_COMBINACOES = 2_000_000
+
+# folga inicial (em pontos previstos) e fator de crescimento entre rodadas
+GAP_INICIAL = 0.5
+GAP_FATOR = 1.5
+
+EPS = 1e-9
+
+
+class _Grupo:
+    """Candidatos de uma posição: pred, preço, posições (iloc) em jogadores e quantidade exigida."""
+
+    def __init__(self, pred: np.ndarray, preco: np.ndarray, idx: np.ndarray, qtd: int):
+        self.pred = pred
+        self.preco = preco
+        self.idx = idx
+        self.qtd = qtd
+
+
+def _lagrangeano(grupos: List[_Grupo], lam: float, cartoletas: float) -> Tuple[float, float]:
+    """
+    L(lam) = lam * C + soma por posição dos qtd maiores (pred - lam * preco).
+    Para todo lam >= 0, L(lam) limita por cima qualquer escalação que caiba em C.
+    Retorna (L, custo do time que atinge o máximo sem orçamento).
+    """
+    total = lam * cartoletas
+    custo = 0.0
+    for g in grupos:
+        a = g.pred - lam * g.preco
+        top = np.argpartition(-a, g.qtd - 1)[:g.qtd]
+        total += float(a[top].sum())
+        custo += float(g.preco[top].sum())
+    return total, custo
+
+
+def _melhor_lambda(grupos: List[_Grupo], cartoletas: float) -> float:
+    # L é convexa em lam; o mínimo fica onde o custo do time "livre" cruza o orçamento
+    if _lagrangeano(grupos, 0.0, cartoletas)[1] <= cartoletas:
+        return 0.0
+
+    lo, hi = 0.0, 1.0
+    while _lagrangeano(grupos, hi, cartoletas)[1] > cartoletas:
+        hi *= 2
+
+    for _ in range(40):
+        mid = (lo + hi) / 2
+        if _lagrangeano(grupos, mid, cartoletas)[1] > cartoletas:
+            lo = mid
+        else:
+            hi = mid
+
+    return lo if _lagrangeano(grupos, lo, cartoletas)[0] < _lagrangeano(grupos, hi, cartoletas)[0] else hi
+
+
+def _subconjuntos(a: np.ndarray, qtd: int, gap: float) -> Optional[List[Tuple[float, Tuple[int, ...]]]]:
+    """
+    Todos os qtd-subconjuntos (posições em `a`, ordenado decrescente) cuja perda
+    em relação aos qtd primeiros é <= gap. None se passar do limite.
+    """
+    topo = float(a[:qtd].sum())
+    m = len(a)
+    out = []
+    escolhidos = []
+
+    def dfs(inicio: int, faltam: int, soma: float) -> bool:
+        if faltam == 0:
+            out.append((topo - soma, tuple(escolhidos)))
+            return len(out) <= LIMITE_COMBINACOES
+        for i in range(inicio, m - faltam + 1):
+            # melhor complemento possível a partir de i são os próximos `faltam`
+            if topo - (soma + float(a[i:i + faltam].sum())) > gap + EPS:
+                break
+            escolhidos.append(i)
+            ok = dfs(i + 1, faltam - 1, soma + float(a[i]))
+            escolhidos.pop()
+            if not ok:
+                return False
+        return True
+
+    return out if dfs(0, qtd, 0.0) else None
+
+
+def _combinar(parcial, grupo, gap: float, cartoletas: float, custo_min_resto: float):
+    """
+    Produto das escalações parciais com as da próxima posição, mantendo só
+    pares com perda total <= gap e custo que ainda deixa montar o resto.
+    Usa searchsorted sobre a perda ordenada para não materializar o produto inteiro.
+    """
+    p_perda, p_val, p_custo, p_mem = parcial
+    g_perda, g_val, g_custo, g_mem = grupo
+
+    cnt = np.searchsorted(g_perda, gap - p_perda + EPS, side="right")
+    total = int(cnt.sum())
+    if total > LIMITE_COMBINACOES:
+        return None
+
+    ia = np.repeat(np.arange(len(p_perda)), cnt)
+    ib = np.arange(total) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+
+    custo = p_custo[ia] + g_custo[ib]
+    ok = custo + custo_min_resto <= cartoletas + EPS
+    ia, ib = ia[ok], ib[ok]
+
+    return (
+        p_perda[ia] + g_perda[ib],
+        p_val[ia] + g_val[ib],
+        custo[ok],
+        np.concatenate([p_mem[ia], g_mem[ib]], axis=1),
+    )
+
+
+def enumerar_top_n(
+    jogadores: pd.DataFrame,
+    cartoletas: float,
+    qtds: Dict[str, int],
+    n: int,
+    min_diferenca: int = 1,
+) -> Tuple[List[List], bool]:
+    """
+    Enumeração k-best exata, sem solver. Com lam ótimo do relaxamento
+    lagrangeano do orçamento, toda escalação S que cabe no orçamento satisfaz
+        valor(S) <= L(lam) - soma por posição da perda de S_pos
+    (perda = quanto S_pos fica abaixo dos qtd melhores em pred - lam * preco).
+    Enumerando todas as escalações com perda <= G, temos *todas* as de valor
+    >= L - G; G cresce até caberem n escalações (respeitando min_diferenca)
+    nessa faixa, e a escolha gulosa em ordem decrescente é a mesma do MIP com
+    cortes: cada escalação escolhida dentro da faixa é a melhor que respeita
+    os cortes das anteriores, já que tudo fora da faixa vale menos.
+
+    `qtds` é a entrada de FORMACOES ({pos: quantidade}); `jogadores` precisa de "pos".
+    Retorna (listas de índices do DataFrame por escalação, completo). Se a
+    enumeração estourar o limite, completo=False e a lista é o prefixo exato
+    obtido na última faixa que coube (as próximas ficam para o MIP).
+    """
+    pos_col = jogadores["pos"].to_numpy()
+    pred = jogadores["pred"].to_numpy(dtype=float)
+    preco = jogadores["preco"].to_numpy(dtype=float)
+
+    grupos = []
+    for pos, qtd in qtds.items():
+        if qtd == 0:
+            continue
+        linhas = np.flatnonzero(pos_col == pos).astype(np.int32)
+        if len(linhas) < qtd:
+            return [], True
+        grupos.append(_Grupo(pred[linhas], preco[linhas], linhas, qtd))
+
+    custo_min = [float(np.sort(g.preco)[:g.qtd].sum()) for g in grupos]
+    if sum(custo_min) > cartoletas + EPS:
+        return [], True
+    custo_min_resto = [sum(custo_min[k + 1:]) for k in range(len(grupos))]
+
+    lam = _melhor_lambda(grupos, cartoletas)
+    limite_sup = lam * cartoletas
+    ordens = []
+    for g in grupos:
+        a = g.pred - lam * g.preco
+        ordem = np.argsort(-a, kind="stable")
+        ordens.append((ordem, a[ordem]))
+        limite_sup += float(a[ordem][:g.qtd].sum())
+
+    # com gap acima disto todas as escalações possíveis já foram enumeradas
+    pior = sum(float(np.sort(g.pred)[:g.qtd].sum()) for g in grupos)
+    gap_max = limite_sup - pior
+
+    def resultado(escolhidas, completo):
+        return [jogadores.index[sorted(e)].tolist() for e in escolhidas], completo
+
+    escolhidas = []
+    gap = GAP_INICIAL
+    while True:
+        listas = []
+        for g, (ordem, a) in zip(grupos, ordens):
+            subs = _subconjuntos(a, g.qtd, gap)
+            if subs is None:
+                return resultado(escolhidas, False)
+            perda = np.array([s[0] for s in subs])
+            mem = ordem[np.array([s[1] for s in subs], dtype=int).reshape(len(subs), g.qtd)]
+            o = np.argsort(perda, kind="stable")
+            listas.append((perda[o], g.pred[mem[o]].sum(axis=1), g.preco[mem[o]].sum(axis=1), g.idx[mem[o]]))
+
+        parcial = listas[0]
+        ok = parcial[2] + custo_min_resto[0] <= cartoletas + EPS
+        parcial = tuple(x[ok] for x in parcial)
+        for k, lista in enumerate(listas[1:], start=1):
+            parcial = _combinar(parcial, lista, gap, cartoletas, custo_min_resto[k])
+            if parcial is None:
+                return resultado(escolhidas, False)
+
+        _, valor, _, mem = parcial
+        # só as de valor >= L - gap estão garantidamente todas presentes
+        completo = gap >= gap_max
+        dentro = valor >= limite_sup - gap - EPS if not completo else np.ones(len(valor), dtype=bool)
+        valor, mem = valor[dentro], mem[dentro]
+
+        escolhidas = []
+        for k in np.argsort(-valor, kind="stable"):
+            s = set(mem[k].tolist())
+            if all(len(s - e) >= min_diferenca for e in escolhidas):
+                escolhidas.append(s)
+                if len(escolhidas) == n:
+                    break
+
+        if len(escolhidas) == n or completo:
+            return resultado(escolhidas, True)
+
+        gap *= GAP_FATOR
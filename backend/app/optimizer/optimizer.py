@@ -1,6 +1,10 @@
+from typing import List
+
 import pulp
 import pandas as pd
 
+from app.optimizer.kbest import enumerar_top_n
+
 POS_MAP = {1: "G", 2: "L", 3: "Z", 4: "M", 5: "A"}
 
 FORMACOES = {
@@ -11,6 +15,20 @@ FORMACOES = {
     "5-3-2": {"G": 1, "Z": 3, "L": 2, "M": 3, "A": 2},
 }
 
+class OrcamentoInsuficiente(ValueError):
+    """Nenhuma escalação da formação cabe nas cartoletas informadas."""
+
+    def __init__(self, cartoletas: float, custo_minimo: float):
+        super().__init__(cartoletas, custo_minimo)
+        self.cartoletas = cartoletas
+        self.custo_minimo = custo_minimo
+
+    def __str__(self):
+        return (
+            f"Orçamento insuficiente: {self.cartoletas:.2f} cartoletas, "
+            f"o time mais barato da formação custa {self.custo_minimo:.2f}"
+        )
+
 def ensure_pos(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     if "pos" not in df.columns:
@@ -19,12 +37,15 @@ def ensure_pos(df: pd.DataFrame) -> pd.DataFrame:
         df["pos"] = df["posicao_id"].map(POS_MAP)
     return df
 
-def montar_titulares(jogadores: pd.DataFrame, cartoletas: float, formacao: str) -> pd.DataFrame:
-    if formacao not in FORMACOES:
-        raise ValueError(f"Formação inválida: {formacao}. Use uma de: {list(FORMACOES.keys())}")
-
+def custo_minimo(jogadores: pd.DataFrame, formacao: str) -> float:
+    """Custo do time mais barato da formação (os qtd mais baratos de cada posição)."""
     jogadores = ensure_pos(jogadores)
+    total = 0.0
+    for pos, qtd in FORMACOES[formacao].items():
+        total += float(jogadores.loc[jogadores["pos"] == pos, "preco"].nsmallest(qtd).sum())
+    return round(total, 2)
 
+def montar_problema(jogadores: pd.DataFrame, cartoletas: float, formacao: str):
     prob = pulp.LpProblem("CartolaTitulares", pulp.LpMaximize)
     idx = jogadores.index.tolist()
 
@@ -33,19 +54,109 @@ def montar_titulares(jogadores: pd.DataFrame, cartoletas: float, formacao: str)
     prob += pulp.lpSum(jogadores.loc[i, "pred"] * x[i] for i in idx)
 
     # orçamento SÓ para titulares (correto)
-    prob += pulp.lpSum(jogadores.loc[i, "preco"] * x[i] for i in idx) <= cartoletas
+    prob += pulp.lpSum(jogadores.loc[i, "preco"] * x[i] for i in idx) <= cartoletas, "orcamento"
 
     prob += pulp.lpSum(x[i] for i in idx) == 11
 
     for pos, qtd in FORMACOES[formacao].items():
         prob += pulp.lpSum(x[i] for i in idx if jogadores.loc[i, "pos"] == pos) == qtd
 
+    return prob, x, idx
+
+def montar_titulares(jogadores: pd.DataFrame, cartoletas: float, formacao: str) -> pd.DataFrame:
+    if formacao not in FORMACOES:
+        raise ValueError(f"Formação inválida: {formacao}. Use uma de: {list(FORMACOES.keys())}")
+
+    jogadores = ensure_pos(jogadores)
+
+    prob, x, idx = montar_problema(jogadores, cartoletas, formacao)
+
     prob.solve(pulp.PULP_CBC_CMD(msg=False))
 
+    # inviável (orçamento abaixo do time mais barato): o CBC deixa uma atribuição
+    # parcial nas variáveis, que não é escalação nenhuma
+    if pulp.LpStatus[prob.status] != "Optimal":
+        return jogadores.iloc[0:0].copy()
+
     chosen_idx = [i for i in idx if x[i].value() == 1]
     titulares = jogadores.loc[chosen_idx].copy()
     return titulares
 
+def reduzir_candidatos(jogadores: pd.DataFrame, formacao: str, n: int = 1, min_diferenca: int = 1) -> pd.DataFrame:
+    """
+    Remove jogadores dominados (pred >= e preço <=, um deles estritamente) por
+    jogadores demais da mesma posição para aparecer nas n escalações:
+      - min_diferenca == 1: qtd + n - 1 dominadores bastam (trocá-lo por um
+        dominador fora do time dá n escalações tão boas quanto);
+      - min_diferenca > 1: n * qtd dominadores garantem um dominador fora de
+        todas as escalações anteriores, então a troca não viola os cortes.
+    """
+    jogadores = ensure_pos(jogadores)
+
+    manter = []
+    for pos, qtd in FORMACOES[formacao].items():
+        grupo = jogadores[jogadores["pos"] == pos]
+        if qtd == 0 or len(grupo) == 0:
+            continue
+
+        pred = grupo["pred"].to_numpy(dtype=float)
+        preco = grupo["preco"].to_numpy(dtype=float)
+
+        # dom[a, b] = True se b domina a
+        melhor_ou_igual = (pred[None, :] >= pred[:, None]) & (preco[None, :] <= preco[:, None])
+        estrito = (pred[None, :] > pred[:, None]) | (preco[None, :] < preco[:, None])
+        n_dom = (melhor_ou_igual & estrito).sum(axis=1)
+
+        limite = qtd + n - 1 if min_diferenca == 1 else n * qtd
+        manter.extend(grupo.index[n_dom < limite].tolist())
+
+    return jogadores[jogadores.index.isin(manter)]
+
+def montar_top_n(
+    jogadores: pd.DataFrame,
+    cartoletas: float,
+    formacao: str,
+    n: int = 5,
+    min_diferenca: int = 1,
+) -> List[pd.DataFrame]:
+    """
+    Enumera as n melhores escalações (pred decrescente), cada uma diferindo
+    em pelo menos `min_diferenca` titulares de todas as anteriores.
+    Usa a enumeração k-best exata de app.optimizer.kbest sobre os candidatos
+    não dominados, sem solver. Se ela estourar o limite de combinações
+    (min_diferenca alto com orçamento apertado), as escalações que faltam saem
+    do MIP com cortes no-good a partir do prefixo já enumerado.
+    """
+    if formacao not in FORMACOES:
+        raise ValueError(f"Formação inválida: {formacao}. Use uma de: {list(FORMACOES.keys())}")
+    if not 1 <= min_diferenca <= 11:
+        raise ValueError("min_diferenca deve estar entre 1 e 11")
+
+    jogadores = reduzir_candidatos(ensure_pos(jogadores), formacao, n, min_diferenca)
+
+    escolhidas, completo = enumerar_top_n(jogadores, cartoletas, FORMACOES[formacao], n, min_diferenca)
+    escalacoes = [jogadores.loc[idx].copy() for idx in escolhidas]
+    if completo:
+        return escalacoes
+
+    prob, x, idx = montar_problema(jogadores, cartoletas, formacao)
+    solver = pulp.PULP_CBC_CMD(msg=False)
+
+    # próximas escalações repetem no máximo 11 - min_diferenca titulares de cada anterior
+    for chosen_idx in escolhidas:
+        prob += pulp.lpSum(x[i] for i in chosen_idx) <= 11 - min_diferenca
+
+    while len(escalacoes) < n:
+        prob.solve(solver)
+        if pulp.LpStatus[prob.status] != "Optimal":
+            break
+
+        chosen_idx = [i for i in idx if (x[i].value() or 0) > 0.5]
+        escalacoes.append(jogadores.loc[chosen_idx].copy())
+        prob += pulp.lpSum(x[i] for i in chosen_idx) <= 11 - min_diferenca
+
+    return escalacoes
+
 def montar_banco(jogadores: pd.DataFrame, titulares: pd.DataFrame) -> pd.DataFrame:
     jogadores = ensure_pos(jogadores)
     titulares = ensure_pos(titulares)
@@ -1,5 +1,5 @@
 import math
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -9,9 +9,14 @@ from sklearn.metrics import mean_absolute_error, mean_squared_error
 from app.core.json_sanitize import sanitize_obj
 from app.ml.etl import load_all_seasons
 from app.ml.features import add_features
+from app.ml.model_cache import get_or_fit
 from app.optimizer.optimizer import montar_titulares, montar_banco, ensure_pos
 from app.optimizer.captain import pick_captain
 from app.optimizer.luxury import pick_luxury_reserve
+from app.services.backtest_store import (
+    PREDICOES, ESCALACOES, round_data_hashes, prediction_key, lineup_key,
+    get as store_get, set as store_put, evict as store_evict,
+)
 
 
 BASE_FEATURES = ["media_5", "std_5", "preco"]
@@ -40,14 +45,18 @@ def _topk_hit_rate_round(df_round: pd.DataFrame, pred_col: str, real_col: str, k
     return float(inter) / float(k) if k > 0 else 0.0
 
 
-def _train_model(X: pd.DataFrame, y: pd.Series) -> RandomForestRegressor:
-    model = RandomForestRegressor(
-        n_estimators=300,
-        random_state=42,
-        n_jobs=-1
+MODEL_PARAMS = {"n_estimators": 300, "random_state": 42}
+
+
+def _train_model(X: pd.DataFrame, y: pd.Series, janela: Tuple[int, int]) -> RandomForestRegressor:
+    # mesma janela/dados/params -> reaproveita o modelo do cache em disco
+    return get_or_fit(
+        lambda: RandomForestRegressor(**MODEL_PARAMS, n_jobs=-1),
+        X,
+        y,
+        MODEL_PARAMS,
+        janela,
     )
-    model.fit(X, y)
-    return model
 
 
 def _predict_baseline(df_round: pd.DataFrame) -> np.ndarray:
@@ -127,6 +136,11 @@ def run_backtest(cartoletas: float = 200.0, formacao: str = "4-3-3", top_k: int
         treina em todas as rodadas anteriores
         prevê jogadores da rodada atual
         escala time e simula pontos reais (cap + luxo)
+
+    Predições (por rodada/dados/modelo) e escalações (também por orçamento e
+    formação) ficam salvas em disco (backtest_store): ao chegar uma rodada nova,
+    só ela é treinada e o resumo é re-agregado; outro orçamento/formação reusa
+    as predições. top_k é recalculado a partir das predições salvas.
     """
     df = load_all_seasons()
     df = add_features(df)
@@ -152,13 +166,11 @@ def run_backtest(cartoletas: float = 200.0, formacao: str = "4-3-3", top_k: int
         .reset_index(drop=True)
     )
 
-    series = []
-    team_real = []
-    team_pred = []
-    team_base = []
-    topk_rates = []
+    model_spec = {"features": features, "model": "RandomForestRegressor", "params": MODEL_PARAMS}
+    data_hashes = round_data_hashes(df, rounds)
+
+    records = []
 
-    # para baseline (escala com media_5)
     for i in range(len(rounds)):
         season = int(rounds.iloc[i]["season"])
         rodada = int(rounds.iloc[i]["rodada"])
@@ -167,70 +179,133 @@ def run_backtest(cartoletas: float = 200.0, formacao: str = "4-3-3", top_k: int
         if i < min_train_rounds:
             continue
 
-        df_train = df.merge(rounds.iloc[:i], on=["season", "rodada"], how="inner")
-        df_round = df[(df["season"] == season) & (df["rodada"] == rodada)].copy()
-
-        # treino de modelo ML
-        X_train = df_train[features]
-        y_train = df_train["pontos"].astype(float)
-
-        # se por algum motivo o treino ficar vazio
-        if len(df_train) < 100:
-            continue
-
-        model = _train_model(X_train, y_train)
+        # predições da rodada já calculadas com os mesmos dados/modelo: reaproveita
+        p_key = prediction_key(season, rodada, data_hashes[(season, rodada)], model_spec)
+        predicoes = store_get(PREDICOES, p_key)
+        if predicoes is None:
+            predicoes = _predict_round(df, rounds, i, features)
+            if predicoes is None:
+                continue
+            store_put(PREDICOES, p_key, predicoes)
 
-        # predição ML para a rodada
-        df_round["pred"] = model.predict(df_round[features])
-        df_round["pred"] = df_round["pred"].replace([np.inf, -np.inf], np.nan).fillna(0)
+        df_round = df[(df["season"] == season) & (df["rodada"] == rodada)].copy()
+        df_round["pred"] = df_round["atleta_id"].map(dict(zip(predicoes["atleta_id"], predicoes["pred"]))).fillna(0)
 
         # baseline: media_5
         df_round["pred_base"] = _predict_baseline(df_round)
         df_round["pred_base"] = df_round["pred_base"].replace([np.inf, -np.inf], np.nan).fillna(0)
 
+        l_key = lineup_key(p_key, cartoletas, formacao)
+        escalacao = store_get(ESCALACOES, l_key)
+        if escalacao is None:
+            escalacao = _lineup_round(df_round, cartoletas, formacao)
+            store_put(ESCALACOES, l_key, escalacao)
+
         # topK hit rate (jogadores)
-        topk_rates.append(_topk_hit_rate_round(df_round, "pred", "pontos", k=top_k))
-
-        # escala time com ML
-        titulares = montar_titulares(df_round, float(cartoletas), formacao)
-        titulares = ensure_pos(titulares)
-
-        banco = montar_banco(df_round, titulares)
-        banco = ensure_pos(banco) if len(banco) else banco
-
-        cap = pick_captain(titulares)
-        luxo = pick_luxury_reserve(titulares, banco) if len(banco) else {}
-
-        real_pts, pred_pts, luxo_info = _simulate_team_points(df_round, titulares, banco, cap, luxo)
-
-        # escala time com baseline (para comparação)
-        df_round_base = df_round.copy()
-        df_round_base["pred"] = df_round_base["pred_base"]  # reutiliza otimizador
-        titulares_base = montar_titulares(df_round_base, float(cartoletas), formacao)
-        titulares_base = ensure_pos(titulares_base)
-        banco_base = montar_banco(df_round_base, titulares_base)
-        banco_base = ensure_pos(banco_base) if len(banco_base) else banco_base
-        cap_base = pick_captain(titulares_base)
-        luxo_base = pick_luxury_reserve(titulares_base, banco_base) if len(banco_base) else {}
-        real_base, pred_base_pts, luxo_info_base = _simulate_team_points(df_round_base, titulares_base, banco_base, cap_base, luxo_base)
-
-        # real_base é "real do time baseline" (comparável)
-        series.append({
-            "season": season,
-            "rodada": rodada,
+        topk_rate = _topk_hit_rate_round(df_round, "pred", "pontos", k=top_k)
+
+        serie = escalacao["serie"]
+        records.append({
+            **escalacao,
+            "serie": {
+                "season": season,
+                "rodada": rodada,
+                "pontos_reais": serie["pontos_reais"],
+                "pontos_previstos": serie["pontos_previstos"],
+                "pontos_reais_baseline": serie["pontos_reais_baseline"],
+                "topk_hit_rate": round(float(topk_rate), 4),
+                "luxo_usou": serie["luxo_usou"],
+                "luxo_delta": serie["luxo_delta"],
+                "capitao": serie["capitao"],
+                "capitao_clube": serie["capitao_clube"],
+            },
+            "topk_hit_rate": float(topk_rate),
+        })
+
+    store_evict()
+
+    return sanitize_obj(_summarize(records, cartoletas, formacao, top_k, min_train_rounds))
+
+
+def _predict_round(
+    df: pd.DataFrame,
+    rounds: pd.DataFrame,
+    i: int,
+    features: List[str],
+) -> Optional[Dict]:
+    season = int(rounds.iloc[i]["season"])
+    rodada = int(rounds.iloc[i]["rodada"])
+
+    df_train = df.merge(rounds.iloc[:i], on=["season", "rodada"], how="inner")
+    df_round = df[(df["season"] == season) & (df["rodada"] == rodada)]
+
+    # treino de modelo ML
+    X_train = df_train[features]
+    y_train = df_train["pontos"].astype(float)
+
+    # se por algum motivo o treino ficar vazio
+    if len(df_train) < 100:
+        return None
+
+    model = _train_model(X_train, y_train, (season, rodada))
+
+    # predição ML para a rodada
+    pred = pd.Series(model.predict(df_round[features])).replace([np.inf, -np.inf], np.nan).fillna(0)
+
+    return {"atleta_id": df_round["atleta_id"].tolist(), "pred": pred.tolist()}
+
+
+def _lineup_round(df_round: pd.DataFrame, cartoletas: float, formacao: str) -> Dict:
+    # escala time com ML
+    titulares = montar_titulares(df_round, float(cartoletas), formacao)
+    titulares = ensure_pos(titulares)
+
+    banco = montar_banco(df_round, titulares)
+    banco = ensure_pos(banco) if len(banco) else banco
+
+    cap = pick_captain(titulares)
+    luxo = pick_luxury_reserve(titulares, banco) if len(banco) else {}
+
+    real_pts, pred_pts, luxo_info = _simulate_team_points(df_round, titulares, banco, cap, luxo)
+
+    # escala time com baseline (para comparação)
+    df_round_base = df_round.copy()
+    df_round_base["pred"] = df_round_base["pred_base"]  # reutiliza otimizador
+    titulares_base = montar_titulares(df_round_base, float(cartoletas), formacao)
+    titulares_base = ensure_pos(titulares_base)
+    banco_base = montar_banco(df_round_base, titulares_base)
+    banco_base = ensure_pos(banco_base) if len(banco_base) else banco_base
+    cap_base = pick_captain(titulares_base)
+    luxo_base = pick_luxury_reserve(titulares_base, banco_base) if len(banco_base) else {}
+    real_base, pred_base_pts, luxo_info_base = _simulate_team_points(df_round_base, titulares_base, banco_base, cap_base, luxo_base)
+
+    # real_base é "real do time baseline" (comparável)
+    return {
+        "serie": {
             "pontos_reais": round(real_pts, 2),
             "pontos_previstos": round(pred_pts, 2),
             "pontos_reais_baseline": round(real_base, 2),
-            "topk_hit_rate": round(float(topk_rates[-1]), 4),
             "luxo_usou": bool(luxo_info["usou"]),
             "luxo_delta": round(float(luxo_info["delta"]), 2),
             "capitao": cap.get("nome", "") if cap else "",
             "capitao_clube": cap.get("clube_nome", "") if cap else "",
-        })
+        },
+        "team_real": float(real_pts),
+        "team_pred": float(pred_pts),
+        "team_base": float(real_base),
+        "titulares": titulares["atleta_id"].tolist(),
+        "titulares_baseline": titulares_base["atleta_id"].tolist(),
+        "capitao_id": cap.get("atleta_id") if cap else None,
+        "reserva_luxo_id": luxo.get("atleta_id") if luxo else None,
+    }
 
-        team_real.append(real_pts)
-        team_pred.append(pred_pts)
-        team_base.append(real_base)
+
+def _summarize(records: List[Dict], cartoletas: float, formacao: str, top_k: int, min_train_rounds: int) -> Dict:
+    series = [r["serie"] for r in records]
+    team_real = [r["team_real"] for r in records]
+    team_pred = [r["team_pred"] for r in records]
+    team_base = [r["team_base"] for r in records]
+    topk_rates = [r["topk_hit_rate"] for r in records]
 
     # métricas do time por rodada
     mae = float(mean_absolute_error(team_real, team_pred)) if len(team_real) else 0.0
@@ -239,7 +314,7 @@ def run_backtest(cartoletas: float = 200.0, formacao: str = "4-3-3", top_k: int
     topk_mean = float(np.mean(topk_rates)) if len(topk_rates) else 0.0
     retorno_medio = float(np.mean(np.array(team_real) - np.array(team_base))) if len(team_real) else 0.0
 
-    summary = {
+    return {
         "config": {
             "cartoletas": float(cartoletas),
             "formacao": formacao,
@@ -256,5 +331,3 @@ def run_backtest(cartoletas: float = 200.0, formacao: str = "4-3-3", top_k: int
         },
         "series": series,
     }
-
-    return sanitize_obj(summary)
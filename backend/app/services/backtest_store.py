@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.json_sanitize import sanitize_obj
+
+STORE_PATH = Path(os.getenv("BACKTEST_STORE_DIR", "data/backtest_store"))
+
+# teto do store em disco; passou disso, remove os registros menos usados (mtime)
+MAX_MB = float(os.getenv("BACKTEST_STORE_MAX_MB", "512"))
+
+# predições dependem só de rodada/dados/modelo; escalações também de orçamento/formação
+PREDICOES = "predicoes"
+ESCALACOES = "escalacoes"
+
+
+def _sha(payload) -> str:
+    raw = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _valores_canonicos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mesmos valores, tipos canônicos: números (int16, Int64, float...) viram
+    float64 e textos (object, category) viram string. Assim o ETL clássico e o
+    em streaming geram o mesmo hash para os mesmos dados.
+    """
+    out = {}
+    for c in df.columns:
+        s = df[c]
+        if pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s):
+            out[c] = s.to_numpy(dtype="float64", na_value=np.nan)
+        else:
+            out[c] = s.astype("string").to_numpy()
+    return pd.DataFrame(out).astype({c: "string" for c, v in out.items() if v.dtype == object})
+
+
+def round_data_hashes(df: pd.DataFrame, rounds: pd.DataFrame) -> Dict[tuple, str]:
+    """
+    Hash encadeado por rodada: o hash de (season, rodada) cobre os dados dessa
+    rodada e de todas as anteriores, ou seja, a janela de treino + a própria rodada.
+    A soma dos hashes de linha não depende da ordem das linhas nem dos dtypes.
+    """
+    cols = sorted(df.columns)
+    row_hash = pd.util.hash_pandas_object(_valores_canonicos(df[cols]), index=False).to_numpy()
+
+    per_round = {}
+    for (season, rodada), pos in df.groupby(["season", "rodada"]).indices.items():
+        per_round[(int(season), int(rodada))] = int(row_hash[pos].sum(dtype=np.uint64))
+
+    hashes = {}
+    prev = _sha(cols)
+    for season, rodada in zip(rounds["season"], rounds["rodada"]):
+        key = (int(season), int(rodada))
+        prev = _sha([prev, key, int(per_round.get(key, 0))])
+        hashes[key] = prev
+    return hashes
+
+
+def prediction_key(season: int, rodada: int, data_hash: str, model_spec: Dict) -> str:
+    return _sha({
+        "season": int(season),
+        "rodada": int(rodada),
+        "data": data_hash,
+        "model": model_spec,
+    })
+
+
+def lineup_key(prediction_key: str, cartoletas: float, formacao: str) -> str:
+    # orçamento em centavos: 200 e 200.0000001 caem na mesma chave
+    return _sha({
+        "predicoes": prediction_key,
+        "centavos": int(round(float(cartoletas) * 100)),
+        "formacao": formacao,
+    })
+
+
+def _path(tipo: str, key: str) -> Path:
+    return STORE_PATH / tipo / key[:2] / f"{key}.json"
+
+
+def get(tipo: str, key: str) -> Optional[Dict]:
+    p = _path(tipo, key)
+    if not p.exists():
+        return None
+    try:
+        with open(p, "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except (OSError, ValueError):
+        # arquivo truncado/corrompido: trata como ausente e recalcula
+        return None
+
+    # marca uso para a limpeza por LRU
+    try:
+        os.utime(p)
+    except OSError:
+        pass
+    return record
+
+
+def set(tipo: str, key: str, record: Dict):
+    p = _path(tipo, key)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(sanitize_obj(record), f)
+    os.replace(tmp, p)
+
+
+def evict(max_mb: Optional[float] = None):
+    """Remove os registros com uso mais antigo até o store caber em max_mb."""
+    limite = (MAX_MB if max_mb is None else max_mb) * 1024 * 1024
+
+    arquivos = []
+    for p in STORE_PATH.glob("*/*/*.json"):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        arquivos.append((st.st_mtime, st.st_size, p))
+
+    total = sum(a[1] for a in arquivos)
+    for _, size, p in sorted(arquivos, key=lambda a: a[0]):
+        if total <= limite:
+            break
+        try:
+            p.unlink()
+        except OSError:
+            continue
+        total -= size
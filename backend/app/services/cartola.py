@@ -1,13 +1,18 @@
+import os
+
 import requests
 from cachetools import TTLCache
 
+# sobrescrito no teste de carga para apontar para o stand-in local (loadtest/cartola_stub.py)
+CARTOLA_API_URL = os.getenv("CARTOLA_API_URL", "https://api.cartola.globo.com").rstrip("/")
+
 cache = TTLCache(maxsize=10, ttl=900)
 
 def get_rodada_atual():
     if "rodada" in cache:
         return cache["rodada"]
 
-    r = requests.get("https://api.cartola.globo.com/mercado/status")
+    r = requests.get(f"{CARTOLA_API_URL}/mercado/status")
     r.raise_for_status()
     data = r.json()
     cache["rodada"] = data
@@ -1,14 +1,36 @@
+import hashlib
+import os
+import threading
+
 import joblib
 import pandas as pd
-from app.optimizer.optimizer import montar_titulares, montar_banco, ensure_pos
+from app.optimizer.optimizer import (
+    OrcamentoInsuficiente, custo_minimo, montar_titulares, montar_banco, montar_top_n, ensure_pos,
+)
+from app.optimizer.budget_index import build_all_indexes, carregar_indices, lookup_titulares, salvar_indices
 from app.optimizer.luxury import pick_luxury_reserve
 from app.optimizer.captain import pick_captain
 from app.core.json_sanitize import sanitize_df_for_json, sanitize_obj
 
-def gerar_time(req):
-    jogadores = pd.read_csv("data/processed/ultima_rodada.csv")
+DATA_PATH = "data/processed/ultima_rodada.csv"
+MODEL_PATH = "models/model.joblib"
+
+# índice de orçamento por formação, gerado uma vez no treino (precalcular_indices)
+INDEX_PATH = "data/processed/indice_orcamento.json"
+
+# previsões da rodada + índices carregados do disco, invalidados
+# quando o csv, o modelo ou o índice mudam (mtime)
+_ESTADO = {"chave": None, "jogadores": None, "indices": {}}
+_LOCK = threading.Lock()
 
-    model = joblib.load("models/model.joblib")
+def _chave_arquivos():
+    indice = os.path.getmtime(INDEX_PATH) if os.path.exists(INDEX_PATH) else None
+    return (os.path.getmtime(DATA_PATH), os.path.getmtime(MODEL_PATH), indice)
+
+def _prever_jogadores() -> pd.DataFrame:
+    jogadores = pd.read_csv(DATA_PATH)
+
+    model = joblib.load(MODEL_PATH)
 
     base_feats = ["media_5", "std_5", "preco"]
     scout_feats = [
@@ -23,9 +45,59 @@ def gerar_time(req):
     jogadores["pred"] = model.predict(X)
     jogadores["pred"] = jogadores["pred"].replace([float("inf"), float("-inf")], 0).fillna(0)
 
-    jogadores = ensure_pos(jogadores)
+    return ensure_pos(jogadores)
+
+def _assinatura(jogadores: pd.DataFrame) -> str:
+    # o índice só vale para exatamente estas previsões/preços
+    cols = jogadores[["atleta_id", "pos", "preco", "pred"]]
+    h = pd.util.hash_pandas_object(cols, index=False).to_numpy()
+    return hashlib.sha1(h.tobytes()).hexdigest()
+
+def precalcular_indices() -> str:
+    """Constrói os índices de orçamento de todas as formações e grava em INDEX_PATH (etapa de treino)."""
+    jogadores = _prever_jogadores()
+    salvar_indices(INDEX_PATH, _assinatura(jogadores), build_all_indexes(jogadores))
+    return INDEX_PATH
 
-    titulares = montar_titulares(jogadores, req.cartoletas, req.formacao)
+def _ler_indices(jogadores: pd.DataFrame) -> dict:
+    if not os.path.exists(INDEX_PATH):
+        print(f"WARN: {INDEX_PATH} não encontrado, gerar-time resolve o MIP a cada chamada")
+        return {}
+
+    assinatura, indices = carregar_indices(INDEX_PATH)
+    if assinatura != _assinatura(jogadores):
+        print(f"WARN: {INDEX_PATH} não corresponde às previsões atuais, ignorado")
+        return {}
+    return indices
+
+def _carregar_jogadores() -> pd.DataFrame:
+    chave = _chave_arquivos()
+    with _LOCK:
+        if _ESTADO["chave"] == chave:
+            return _ESTADO["jogadores"]
+
+    jogadores = _prever_jogadores()
+    indices = _ler_indices(jogadores)
+
+    with _LOCK:
+        _ESTADO["chave"] = chave
+        _ESTADO["jogadores"] = jogadores
+        _ESTADO["indices"] = indices
+    return jogadores
+
+def _indice(formacao: str):
+    with _LOCK:
+        return _ESTADO["indices"].get(formacao)
+
+def aquecer():
+    """Carrega previsões e índices no boot dos workers (nada é recalculado aqui)."""
+    # roda como initializer do pool: uma exceção aqui quebraria o pool inteiro
+    try:
+        _carregar_jogadores()
+    except Exception as e:
+        print(f"WARN: aquecimento ignorado ({type(e).__name__}: {e})")
+
+def _montar_resposta(jogadores: pd.DataFrame, titulares: pd.DataFrame, formacao: str, cartoletas: float) -> dict:
     titulares = ensure_pos(titulares)
 
     banco = montar_banco(jogadores, titulares)
@@ -46,9 +118,9 @@ def gerar_time(req):
 
     pts_total = pts_tit + cap_bonus
 
-    response = {
-        "formacao": req.formacao,
-        "cartoletas_disponiveis": float(req.cartoletas),
+    return {
+        "formacao": formacao,
+        "cartoletas_disponiveis": float(cartoletas),
         "titulares": titulares.to_dict(orient="records"),
         "banco": banco.to_dict(orient="records") if len(banco) else [],
         "capitao": cap,
@@ -62,5 +134,47 @@ def gerar_time(req):
         },
     }
 
+def gerar_time(req):
+    jogadores = _carregar_jogadores()
+
+    index = _indice(req.formacao)
+    if index is not None:
+        titulares = lookup_titulares(index, jogadores, req.cartoletas)
+    else:
+        titulares = montar_titulares(jogadores, req.cartoletas, req.formacao)
+        if len(titulares) == 0:
+            raise OrcamentoInsuficiente(req.cartoletas, custo_minimo(jogadores, req.formacao))
+
+    response = _montar_resposta(jogadores, titulares, req.formacao, req.cartoletas)
+
     # sanitiza dict final (resolve numpy/int64 etc)
     return sanitize_obj(response)
+
+def gerar_times_alternativos(req):
+    jogadores = _carregar_jogadores()
+
+    escalacoes = montar_top_n(
+        jogadores,
+        req.cartoletas,
+        req.formacao,
+        n=req.n,
+        min_diferenca=req.min_diferenca,
+    )
+    if not escalacoes:
+        raise OrcamentoInsuficiente(req.cartoletas, custo_minimo(jogadores, req.formacao))
+
+    times = []
+    for ordem, titulares in enumerate(escalacoes, start=1):
+        time = _montar_resposta(jogadores, titulares, req.formacao, req.cartoletas)
+        time["ordem"] = ordem
+        times.append(time)
+
+    response = {
+        "formacao": req.formacao,
+        "cartoletas_disponiveis": float(req.cartoletas),
+        "n_solicitado": int(req.n),
+        "min_diferenca": int(req.min_diferenca),
+        "times": times,
+    }
+
+    return sanitize_obj(response)
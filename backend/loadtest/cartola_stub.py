@@ -0,0 +1,56 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+
+def _payloads(workdir: Path):
+    jogadores = pd.read_csv(Path(workdir) / "data" / "processed" / "ultima_rodada.csv")
+    rodada = int(jogadores["rodada"].max()) if "rodada" in jogadores.columns else 1
+
+    atletas = []
+    for r in jogadores.to_dict(orient="records"):
+        atletas.append({
+            "atleta_id": int(r["atleta_id"]),
+            "apelido": r.get("apelido"),
+            "clube_id": int(r["clube_id"]) if pd.notna(r.get("clube_id")) else None,
+            "posicao_id": int(r["posicao_id"]),
+            "preco_num": float(r["preco"]),
+            "media_num": float(r.get("media", 0) or 0),
+            "status_id": 7,
+        })
+
+    return {
+        "/mercado/status": {"rodada_atual": rodada + 1, "status_mercado": 1, "temporada": 2020},
+        "/atletas/mercado": {"atletas": atletas},
+    }
+
+
+def start(workdir: Path, port: int = 0):
+    """
+    Stand-in local de api.cartola.globo.com (mercado/status, atletas/mercado)
+    servindo os dados sintéticos do workdir. Retorna (server, base_url).
+    """
+    payloads = {k: json.dumps(v).encode("utf-8") for k, v in _payloads(workdir).items()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = payloads.get(self.path.split("?")[0].rstrip("/"))
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
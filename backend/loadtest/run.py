@@ -0,0 +1,413 @@
+"""
+Teste de carga da API (gerar-time / gerar-times / backtest) sobre dados sintéticos.
+
+    cd backend
+    python -m loadtest.run --concorrencia 32 --requisicoes 500 --salvar-baseline loadtest/baseline.json
+    python -m loadtest.run --concorrencia 32 --requisicoes 500 --baseline loadtest/baseline.json
+
+Sai com código 1 se p95/p99 ou throughput regredirem além de --tolerancia.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from loadtest import cartola_stub
+from loadtest.synthetic import BACKEND_DIR, preparar_workdir
+
+FORMACOES = ["4-3-3", "4-4-2", "3-4-3", "3-5-2", "5-3-2"]
+
+# pares (orçamento, formação) repetidos de gerar-time/gerar-times com --gerar-hit;
+# os "miss" sorteiam orçamento e formação novos a cada requisição
+GERAR_QUENTES = [(100.0, "4-3-3"), (140.0, "4-4-2"), (200.0, "3-5-2")]
+
+# parâmetros de backtest repetidos (acertam simple_cache / backtest_store);
+# os "miss" sorteiam um orçamento novo a cada requisição
+BACKTEST_QUENTES = [
+    {"cartoletas": 200.0, "formacao": "4-3-3", "top_k": 20, "min_train_rounds": 5},
+    {"cartoletas": 150.0, "formacao": "3-5-2", "top_k": 20, "min_train_rounds": 5},
+]
+
+# métricas comparadas com a baseline: (nome, maior_e_pior)
+METRICAS_BASELINE = [("p95_ms", True), ("p99_ms", True), ("throughput_rps", False)]
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    v = sorted(valores)
+    # nearest-rank
+    k = max(0, min(len(v) - 1, math.ceil(p / 100.0 * len(v)) - 1))
+    return v[k]
+
+
+def _parse_mix(texto: str) -> Dict[str, float]:
+    mix = {}
+    for parte in texto.split(","):
+        nome, peso = parte.split("=")
+        mix[nome.strip()] = float(peso)
+    desconhecidos = set(mix) - {"gerar-time", "gerar-times", "backtest"}
+    if desconhecidos:
+        raise SystemExit(f"mix inválido: {sorted(desconhecidos)}")
+    return mix
+
+
+# ---------------------------------------------------------------------------
+# RSS por processo (Linux /proc)
+# ---------------------------------------------------------------------------
+
+def _descendentes(pid: int) -> List[int]:
+    filhos = defaultdict(list)
+    for d in Path("/proc").iterdir():
+        if not d.name.isdigit():
+            continue
+        try:
+            stat = (d / "stat").read_text()
+        except OSError:
+            continue
+        # campo 4 (ppid), depois do "(comm)" que pode conter espaços
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        filhos[ppid].append(int(d.name))
+
+    out, pilha = [], [pid]
+    while pilha:
+        p = pilha.pop()
+        out.append(p)
+        pilha.extend(filhos.get(p, []))
+    return out
+
+
+def _rss_mb(pid: int) -> float:
+    try:
+        for linha in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if linha.startswith("VmRSS:"):
+                return int(linha.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return 0.0
+
+
+def _eh_worker_pool(pid: int) -> bool:
+    # workers do ProcessPoolExecutor (spawn) rodam "from multiprocessing.spawn import spawn_main";
+    # ficam de fora os processos curtos do CBC e o resource_tracker
+    try:
+        return b"multiprocessing.spawn" in Path(f"/proc/{pid}/cmdline").read_bytes()
+    except OSError:
+        return False
+
+
+class AmostradorRSS:
+    """
+    Guarda o pico de RSS do servidor e de cada worker dos pools, rotulando os
+    workers pela fila (pids vindos de /api/metrics/execucao).
+    """
+
+    def __init__(self, pid: int, base_url: str, intervalo_s: float = 0.5):
+        self.pid = pid
+        self.base_url = base_url
+        self.intervalo_s = intervalo_s
+        self.pico: Dict[int, float] = {}
+        self.fila_do_pid: Dict[int, str] = {}
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _atualizar_filas(self):
+        try:
+            execucao = httpx.get(f"{self.base_url}/api/metrics/execucao", timeout=2.0).json()
+        except (httpx.HTTPError, ValueError):
+            return
+        for fila, m in execucao.items():
+            for p in m.get("pids", []):
+                self.fila_do_pid[int(p)] = fila
+
+    def _amostrar(self):
+        self._atualizar_filas()
+        for p in _descendentes(self.pid):
+            if p != self.pid and not _eh_worker_pool(p):
+                continue
+            self.pico[p] = max(self.pico.get(p, 0.0), _rss_mb(p))
+
+    def _loop(self):
+        while not self._parar.is_set():
+            self._amostrar()
+            self._parar.wait(self.intervalo_s)
+
+    def rss_por_fila(self) -> Dict:
+        """{"servidor": mb, "<fila>": {pid: mb}}; worker fora das métricas vai em "sem_fila"."""
+        out: Dict = {}
+        for p, mb in sorted(self.pico.items()):
+            if mb <= 0:
+                continue
+            if p == self.pid:
+                out["servidor"] = round(mb, 1)
+            else:
+                out.setdefault(self.fila_do_pid.get(p, "sem_fila"), {})[str(p)] = round(mb, 1)
+        return out
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._parar.set()
+        self._thread.join()
+        self._amostrar()
+
+
+# ---------------------------------------------------------------------------
+# servidor
+# ---------------------------------------------------------------------------
+
+def _env_servidor(workdir: Path, cartola_url: str) -> Dict[str, str]:
+    return {
+        "PYTHONPATH": str(BACKEND_DIR),
+        "CARTOLA_API_URL": cartola_url,
+        "BACKTEST_STORE_DIR": str(workdir / "data" / "backtest_store"),
+    }
+
+
+def _subir_uvicorn(workdir: Path, porta: int, cartola_url: str):
+    env = dict(os.environ, **_env_servidor(workdir, cartola_url))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(porta)],
+        cwd=workdir,
+        env=env,
+    )
+    return proc, proc.pid
+
+
+def _subir_inprocess(workdir: Path, porta: int, cartola_url: str):
+    # o app usa caminhos relativos (data/, models/) e lê env no import
+    os.environ.update(_env_servidor(workdir, cartola_url))
+    os.chdir(workdir)
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    import uvicorn
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=porta, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    return server, os.getpid()
+
+
+def _esperar_health(base_url: str, timeout_s: float = 120.0):
+    fim = time.monotonic() + timeout_s
+    while time.monotonic() < fim:
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.3)
+    raise SystemExit(f"API não respondeu em {timeout_s:.0f}s")
+
+
+# ---------------------------------------------------------------------------
+# carga
+# ---------------------------------------------------------------------------
+
+def _sortear_requisicao(args, mix: Dict[str, float], rnd: random.Random):
+    tipo = rnd.choices(list(mix), weights=list(mix.values()))[0]
+    formacao = rnd.choice(args.formacoes)
+    cartoletas = rnd.choice(args.orcamentos) if args.orcamentos else round(rnd.uniform(60, 500), 2)
+
+    if tipo != "backtest" and args.gerar_hit is not None:
+        if rnd.random() < args.gerar_hit:
+            cartoletas, formacao = rnd.choice(GERAR_QUENTES)
+        else:
+            cartoletas = round(rnd.uniform(60, 500), 2)
+
+    if tipo == "gerar-time":
+        return tipo, "POST", "/api/gerar-time", {"json": {"cartoletas": cartoletas, "formacao": formacao}}
+
+    if tipo == "gerar-times":
+        body = {"cartoletas": cartoletas, "formacao": formacao, "n": args.top_n, "min_diferenca": 1}
+        return tipo, "POST", "/api/gerar-times", {"json": body}
+
+    if rnd.random() < args.backtest_hit:
+        params = dict(rnd.choice(BACKTEST_QUENTES))
+    else:
+        params = {"cartoletas": round(rnd.uniform(100, 300), 2), "formacao": formacao, "top_k": 20, "min_train_rounds": 5}
+    return tipo, "GET", "/api/backtest/resumo", {"params": params}
+
+
+async def _carga(base_url: str, args, mix: Dict[str, float]):
+    rnd = random.Random(args.seed)
+    fila = [_sortear_requisicao(args, mix, rnd) for _ in range(args.requisicoes)]
+    resultados = []
+
+    limits = httpx.Limits(max_connections=args.concorrencia, max_keepalive_connections=args.concorrencia)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+
+        async def worker():
+            while fila:
+                tipo, metodo, url, kw = fila.pop()
+                inicio = time.perf_counter()
+                try:
+                    r = await client.request(metodo, url, **kw)
+                    status = r.status_code
+                except httpx.HTTPError:
+                    status = 0
+                resultados.append((tipo, status, (time.perf_counter() - inicio) * 1000.0))
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concorrencia)))
+        duracao = time.perf_counter() - inicio
+
+    return resultados, duracao
+
+
+def _relatorio(resultados, duracao: float, rss: Dict) -> Dict:
+    por_tipo = defaultdict(list)
+    for tipo, status, ms in resultados:
+        por_tipo[tipo].append((status, ms))
+    por_tipo["total"] = [(s, ms) for _, s, ms in resultados]
+
+    endpoints = {}
+    for tipo, itens in por_tipo.items():
+        ok = [ms for s, ms in itens if s == 200]
+        status = defaultdict(int)
+        for s, _ in itens:
+            status[str(s)] += 1
+        endpoints[tipo] = {
+            "requisicoes": len(itens),
+            "status": dict(status),
+            "throughput_rps": round(len(ok) / duracao, 2) if duracao > 0 else 0.0,
+            "p50_ms": round(_percentil(ok, 50), 1),
+            "p95_ms": round(_percentil(ok, 95), 1),
+            "p99_ms": round(_percentil(ok, 99), 1),
+        }
+
+    return {
+        "duracao_s": round(duracao, 2),
+        "endpoints": endpoints,
+        "rss_mb": rss,
+    }
+
+
+def comparar_baseline(atual: Dict, baseline: Dict, tolerancia: float) -> List[str]:
+    regressoes = []
+    for tipo, base in baseline.get("endpoints", {}).items():
+        novo = atual["endpoints"].get(tipo)
+        if novo is None:
+            continue
+        for metrica, maior_e_pior in METRICAS_BASELINE:
+            b, n = float(base.get(metrica, 0.0)), float(novo.get(metrica, 0.0))
+            if b <= 0:
+                continue
+            if maior_e_pior and n > b * (1 + tolerancia):
+                regressoes.append(f"{tipo}.{metrica}: {n} > {b} (+{tolerancia:.0%})")
+            if not maior_e_pior and n < b * (1 - tolerancia):
+                regressoes.append(f"{tipo}.{metrica}: {n} < {b} (-{tolerancia:.0%})")
+    return regressoes
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--modo", choices=["uvicorn", "inprocess"], default="uvicorn")
+    ap.add_argument("--workdir", type=Path, help="reaproveita um workdir já gerado (senão cria um temporário)")
+    ap.add_argument("--seasons", type=int, default=1)
+    ap.add_argument("--rodadas", type=int, default=10)
+    ap.add_argument("--jogadores", type=int, default=300)
+    ap.add_argument("--concorrencia", type=int, default=16)
+    ap.add_argument("--requisicoes", type=int, default=200)
+    ap.add_argument("--mix", default="gerar-time=0.8,gerar-times=0.1,backtest=0.1")
+    ap.add_argument("--orcamentos", type=lambda s: [float(x) for x in s.split(",")], default=None,
+                    help="lista fixa de orçamentos (padrão: uniforme em 60-500)")
+    ap.add_argument("--formacoes", type=lambda s: s.split(","), default=FORMACOES)
+    ap.add_argument("--top-n", type=int, default=5)
+    ap.add_argument("--gerar-hit", type=float, default=None,
+                    help="fração de gerar-time/gerar-times com (orçamento, formação) repetidos (padrão: sorteio livre)")
+    ap.add_argument("--backtest-hit", type=float, default=0.8, help="fração de backtests com parâmetros repetidos")
+    ap.add_argument("--timeout", type=float, default=300.0)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--saida", type=Path, help="grava o relatório em JSON")
+    ap.add_argument("--baseline", type=Path)
+    ap.add_argument("--salvar-baseline", type=Path)
+    ap.add_argument("--tolerancia", type=float, default=0.2)
+    args = ap.parse_args(argv)
+
+    mix = _parse_mix(args.mix)
+
+    if args.workdir and (args.workdir / "models" / "model.joblib").exists():
+        workdir = args.workdir.resolve()
+    else:
+        workdir = (args.workdir or Path(tempfile.mkdtemp(prefix="cartola-load-"))).resolve()
+        print(f"Gerando dados sintéticos em {workdir} ...")
+        preparar_workdir(workdir, args.seasons, args.rodadas, args.jogadores, args.seed)
+
+    stub, cartola_url = cartola_stub.start(workdir)
+    porta = _porta_livre()
+    base_url = f"http://127.0.0.1:{porta}"
+
+    if args.modo == "uvicorn":
+        servidor, pid = _subir_uvicorn(workdir, porta, cartola_url)
+    else:
+        servidor, pid = _subir_inprocess(workdir, porta, cartola_url)
+
+    try:
+        _esperar_health(base_url)
+        with AmostradorRSS(pid, base_url) as amostrador:
+            resultados, duracao = asyncio.run(_carga(base_url, args, mix))
+        relatorio = _relatorio(resultados, duracao, amostrador.rss_por_fila())
+        try:
+            relatorio["execucao"] = httpx.get(f"{base_url}/api/metrics/execucao", timeout=5.0).json()
+        except (httpx.HTTPError, ValueError):
+            pass
+    finally:
+        if args.modo == "uvicorn":
+            servidor.terminate()
+            servidor.wait(timeout=30)
+        else:
+            servidor.should_exit = True
+        stub.shutdown()
+
+    relatorio["config"] = {
+        "modo": args.modo,
+        "concorrencia": args.concorrencia,
+        "requisicoes": args.requisicoes,
+        "mix": mix,
+        "gerar_hit": args.gerar_hit,
+        "backtest_hit": args.backtest_hit,
+    }
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    print(texto)
+    if args.saida:
+        args.saida.write_text(texto)
+    if args.salvar_baseline:
+        args.salvar_baseline.write_text(texto)
+
+    if args.baseline:
+        regressoes = comparar_baseline(relatorio, json.loads(args.baseline.read_text()), args.tolerancia)
+        if regressoes:
+            print("REGRESSÃO em relação à baseline:")
+            for r in regressoes:
+                print(f"  - {r}")
+            return 1
+        print("OK: dentro da tolerância da baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
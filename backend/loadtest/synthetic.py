@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+SCOUTS = ["G", "A", "SG", "DS", "FF", "FS"]
+
+# média de pontos por posição (1=G, 2=L, 3=Z, 4=M, 5=A)
+MEDIA_POS = {1: 3.5, 2: 3.0, 3: 2.8, 4: 3.2, 5: 3.6}
+
+
+def _jogadores(n_jogadores: int, rng: np.random.Generator) -> pd.DataFrame:
+    posicao = rng.choice([1, 2, 3, 4, 5], size=n_jogadores, p=[0.1, 0.2, 0.2, 0.3, 0.2])
+    clube = rng.integers(1, 21, size=n_jogadores)
+    atleta_id = np.arange(10000, 10000 + n_jogadores)
+    return pd.DataFrame({
+        "atletas.atleta_id": atleta_id,
+        "atletas.nome": [f"Jogador {i}" for i in atleta_id],
+        "atletas.apelido": [f"J{i}" for i in atleta_id],
+        "atletas.slug": [f"j-{i}" for i in atleta_id],
+        "atletas.clube_id": 260 + clube,
+        "atletas.clube.id.full.name": [f"CLB{c:02d}" for c in clube],
+        "atletas.posicao_id": posicao,
+        # habilidade latente: define nível de pontos e preço
+        "_skill": rng.normal(0, 1.5, size=n_jogadores),
+    })
+
+
+def gerar_raw(raw_dir: Path, seasons: int = 1, rodadas: int = 10, n_jogadores: int = 300, seed: int = 42):
+    """Gera data/raw/<season>/rodada-<n>.csv no formato do ETL (colunas 'atletas.*' + scouts)."""
+    rng = np.random.default_rng(seed)
+    base = _jogadores(n_jogadores, rng)
+
+    for s in range(seasons):
+        season = 2020 + s
+        season_dir = raw_dir / str(season)
+        season_dir.mkdir(parents=True, exist_ok=True)
+
+        preco = np.clip(8 + 3 * base["_skill"].to_numpy() + rng.normal(0, 2, n_jogadores), 1.0, 30.0)
+        soma = np.zeros(n_jogadores)
+
+        for rodada in range(1, rodadas + 1):
+            media_pos = base["atletas.posicao_id"].map(MEDIA_POS).to_numpy()
+            pontos = media_pos + base["_skill"].to_numpy() + rng.normal(0, 3, n_jogadores)
+            soma += pontos
+            variacao = np.round(0.1 * (pontos - media_pos), 2)
+            preco = np.clip(preco + variacao, 1.0, 30.0)
+
+            df = base.drop(columns=["_skill"]).copy()
+            df["atletas.preco_num"] = np.round(preco, 2)
+            df["atletas.pontos_num"] = np.round(pontos, 2)
+            df["atletas.media_num"] = np.round(soma / rodada, 2)
+            df["atletas.variacao_num"] = variacao
+            df["atletas.jogos_num"] = rodada
+            for scout in SCOUTS:
+                df[scout] = rng.poisson(0.3 if scout in ("G", "A") else 1.0, n_jogadores)
+
+            df.to_csv(season_dir / f"rodada-{rodada}.csv", index=False)
+
+
+def preparar_workdir(workdir: Path, seasons: int = 1, rodadas: int = 10, n_jogadores: int = 300, seed: int = 42):
+    """
+    Monta um diretório de trabalho equivalente ao do deploy (data/raw,
+    data/processed, models) e treina com o pipeline real (app.ml.train_real).
+    """
+    workdir = Path(workdir)
+    gerar_raw(workdir / "data" / "raw", seasons, rodadas, n_jogadores, seed)
+    (workdir / "data" / "processed").mkdir(parents=True, exist_ok=True)
+    (workdir / "models").mkdir(parents=True, exist_ok=True)
+
+    env = dict(os.environ, PYTHONPATH=str(BACKEND_DIR))
+    subprocess.run([sys.executable, "-m", "app.ml.train_real"], cwd=workdir, env=env, check=True)
+    return workdir
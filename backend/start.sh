@@ -20,5 +20,12 @@ else
   echo "WARN: artifacts/ultima_rodada.csv not found"
 fi
 
+if [ -f "artifacts/indice_orcamento.json" ]; then
+  cp -f artifacts/indice_orcamento.json data/processed/indice_orcamento.json
+  echo "OK: data/processed/indice_orcamento.json restored"
+else
+  echo "WARN: artifacts/indice_orcamento.json not found (gerar-time will solve on each request)"
+fi
+
 echo "=== Starting API on port ${PORT:-8000} ==="
 exec uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8000}
@@ -0,0 +1,35 @@
+import pickle
+
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.core.executor import FilaCheia
+from app.main import app
+from app.optimizer.optimizer import OrcamentoInsuficiente
+
+
+def test_orcamento_insuficiente_vira_422(monkeypatch):
+    async def executar_fake(fila, fn, *args, **kwargs):
+        # a exceção volta do worker por pickle antes de chegar ao handler
+        raise pickle.loads(pickle.dumps(OrcamentoInsuficiente(10.0, 52.3)))
+
+    monkeypatch.setattr(routes, "executar", executar_fake)
+
+    resp = TestClient(app).post("/api/gerar-time", json={"cartoletas": 10, "formacao": "4-3-3"})
+
+    assert resp.status_code == 422
+    assert resp.json()["custo_minimo"] == 52.3
+    assert "52.30" in resp.json()["detail"]
+
+
+def test_fila_cheia_vira_429_com_retry_after(monkeypatch):
+    async def executar_fake(fila, fn, *args, **kwargs):
+        raise FilaCheia(fila, 7)
+
+    monkeypatch.setattr(routes, "executar", executar_fake)
+
+    resp = TestClient(app).post("/api/gerar-time", json={"cartoletas": 100, "formacao": "4-3-3"})
+
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "7"
+    assert resp.json()["fila"] == "interativo"
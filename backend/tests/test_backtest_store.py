@@ -0,0 +1,96 @@
+import os
+import random
+
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from app.services import backtest_service, backtest_store
+from app.services.backtest_store import round_data_hashes
+
+
+def test_hash_encadeado_muda_so_a_partir_da_rodada_alterada():
+    df = pd.DataFrame({
+        "season": [2025] * 6,
+        "rodada": [1, 1, 2, 2, 3, 3],
+        "atleta_id": [1, 2, 1, 2, 1, 2],
+        "pontos": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+    })
+    rounds = df[["season", "rodada"]].drop_duplicates().reset_index(drop=True)
+
+    antes = round_data_hashes(df, rounds)
+
+    # ordem das linhas não importa
+    assert round_data_hashes(df.iloc[::-1], rounds) == antes
+
+    df.loc[df["rodada"] == 2, "pontos"] += 1
+    depois = round_data_hashes(df, rounds)
+
+    assert depois[(2025, 1)] == antes[(2025, 1)]
+    assert depois[(2025, 2)] != antes[(2025, 2)]
+    assert depois[(2025, 3)] != antes[(2025, 3)]
+
+
+def _temporada_sintetica(n_rodadas: int) -> pd.DataFrame:
+    rnd = random.Random(3)
+    atletas = [(a, 1 + a % 5, rnd.uniform(2, 15)) for a in range(1, 41)]
+    rows = []
+    for rodada in range(1, n_rodadas + 1):
+        for atleta_id, posicao_id, preco in atletas:
+            rows.append({
+                "season": 2025,
+                "rodada": rodada,
+                "atleta_id": atleta_id,
+                "posicao_id": posicao_id,
+                "preco": round(preco, 2),
+                "pontos": round(rnd.uniform(-2, 12), 2),
+            })
+    return pd.DataFrame(rows)
+
+
+def test_rodada_nova_so_treina_ela(tmp_path, monkeypatch):
+    monkeypatch.setattr(backtest_store, "STORE_PATH", tmp_path)
+
+    treinos = []
+
+    def treino_fake(X, y, janela):
+        treinos.append(janela)
+        return LinearRegression().fit(X, y)
+
+    monkeypatch.setattr(backtest_service, "_train_model", treino_fake)
+
+    temporada = {"df": _temporada_sintetica(7)}
+    monkeypatch.setattr(backtest_service, "load_all_seasons", lambda: temporada["df"].copy())
+
+    primeiro = backtest_service.run_backtest(cartoletas=60.0, formacao="4-3-3", top_k=5, min_train_rounds=3)
+    assert treinos == [(2025, 4), (2025, 5), (2025, 6), (2025, 7)]
+
+    # chega a rodada 8: só ela é treinada, as anteriores vêm do store
+    treinos.clear()
+    temporada["df"] = _temporada_sintetica(8)
+    segundo = backtest_service.run_backtest(cartoletas=60.0, formacao="4-3-3", top_k=5, min_train_rounds=3)
+    assert treinos == [(2025, 8)]
+    assert segundo["series"][:4] == primeiro["series"]
+
+    # outro orçamento/top_k reusa as predições (nenhum treino), só reescala
+    treinos.clear()
+    outro = backtest_service.run_backtest(cartoletas=80.0, formacao="4-3-3", top_k=10, min_train_rounds=3)
+    assert treinos == []
+    assert outro["metrics"]["n_rodadas_avaliadas"] == 5
+
+
+def test_evict_remove_menos_usados(tmp_path, monkeypatch):
+    monkeypatch.setattr(backtest_store, "STORE_PATH", tmp_path)
+
+    for i, key in enumerate(["aa1", "bb2", "cc3"]):
+        backtest_store.set(backtest_store.PREDICOES, key, {"x": "0" * 4000})
+        p = tmp_path / backtest_store.PREDICOES / key[:2] / f"{key}.json"
+        os.utime(p, (1000 + i, 1000 + i))
+
+    # leitura renova o uso de "aa1"
+    assert backtest_store.get(backtest_store.PREDICOES, "aa1") is not None
+
+    backtest_store.evict(max_mb=8500 / (1024 * 1024))
+
+    assert backtest_store.get(backtest_store.PREDICOES, "aa1") is not None
+    assert backtest_store.get(backtest_store.PREDICOES, "bb2") is None
+    assert backtest_store.get(backtest_store.PREDICOES, "cc3") is not None
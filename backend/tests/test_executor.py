@@ -0,0 +1,151 @@
+import asyncio
+import os
+import signal
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.core import executor
+from app.services import team_generator
+
+
+@pytest.fixture
+def fila_teste(monkeypatch):
+    # fila própria com 1 worker e 1 vaga de espera: 2 tarefas em voo, a 3ª é rejeitada
+    monkeypatch.setitem(executor.FILAS, "teste", {"workers": 1, "max_fila": 1, "initializer": None})
+    monkeypatch.setitem(executor._STATS, "teste", {
+        "em_voo": 0, "concluidas": 0, "falhas": 0, "rejeitadas": 0, "latencia_media_s": 0.0,
+    })
+    yield "teste"
+    pool = executor._POOLS.pop("teste", None)
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _esperar_fila_vazia(fila: str, timeout: float = 30.0):
+    limite = time.monotonic() + timeout
+    while executor._STATS[fila]["em_voo"] and time.monotonic() < limite:
+        time.sleep(0.05)
+
+
+def test_fila_cheia_depois_de_workers_mais_max_fila(fila_teste):
+    async def cenario():
+        a = asyncio.ensure_future(executor.executar(fila_teste, time.sleep, 1.0))
+        b = asyncio.ensure_future(executor.executar(fila_teste, time.sleep, 1.0))
+        await asyncio.sleep(0)
+
+        with pytest.raises(executor.FilaCheia) as exc:
+            await executor.executar(fila_teste, time.sleep, 1.0)
+        assert exc.value.retry_after >= 1
+
+        await asyncio.gather(a, b)
+
+    asyncio.run(cenario())
+
+    st = executor._STATS[fila_teste]
+    assert st["em_voo"] == 0
+    assert st["concluidas"] == 2
+    assert st["rejeitadas"] == 1
+
+
+def test_em_voo_volta_a_zero_apos_cancelamento(fila_teste):
+    async def cenario():
+        a = asyncio.ensure_future(executor.executar(fila_teste, time.sleep, 0.5))
+        b = asyncio.ensure_future(executor.executar(fila_teste, time.sleep, 0.5))
+        await asyncio.sleep(0.1)
+        # cliente desconectou: a tarefa pode já estar no worker, mas a contagem fecha
+        a.cancel()
+        b.cancel()
+        await asyncio.gather(a, b, return_exceptions=True)
+
+    asyncio.run(cenario())
+    _esperar_fila_vazia(fila_teste)
+
+    st = executor._STATS[fila_teste]
+    assert st["em_voo"] == 0
+    assert st["concluidas"] + st["falhas"] == 2
+
+
+def test_worker_morto_descarta_pool(fila_teste):
+    async def cenario():
+        with pytest.raises(BrokenProcessPool):
+            await executor.executar(fila_teste, os._exit, 1)
+        # pool quebrado foi descartado: a próxima tarefa sobe um novo
+        return await executor.executar(fila_teste, os.getpid)
+
+    pid = asyncio.run(cenario())
+
+    st = executor._STATS[fila_teste]
+    assert pid != os.getpid()
+    assert st["em_voo"] == 0
+    assert st["falhas"] == 1
+    assert st["concluidas"] == 1
+
+
+def test_worker_ocioso_morto_descarta_pool(fila_teste):
+    async def cenario():
+        pid = await executor.executar(fila_teste, os.getpid)
+        pool = executor._POOLS[fila_teste]
+
+        # OOM kill com o worker parado: nenhuma tarefa em voo vê o pool quebrar
+        os.kill(pid, signal.SIGKILL)
+        limite = time.monotonic() + 10
+        while not pool._broken and time.monotonic() < limite:
+            await asyncio.sleep(0.05)
+        assert pool._broken
+
+        return pid, await executor.executar(fila_teste, os.getpid)
+
+    morto, pid = asyncio.run(cenario())
+
+    st = executor._STATS[fila_teste]
+    assert pid not in (morto, os.getpid())
+    assert st["em_voo"] == 0
+    assert st["falhas"] == 0
+    assert st["concluidas"] == 2
+
+
+def test_callback_atrasado_nao_descarta_pool_novo(fila_teste):
+    velho = executor._pool(fila_teste)
+    executor._POOLS.pop(fila_teste)
+    # outra requisição já subiu o pool novo quando chega o callback do velho
+    novo = executor._pool(fila_teste)
+    velho.shutdown(wait=False)
+
+    fut = Future()
+    fut.set_exception(BrokenProcessPool("worker morreu"))
+    executor._STATS[fila_teste]["em_voo"] = 1
+    executor._concluir(fila_teste, velho, time.monotonic(), fut)
+
+    assert executor._POOLS[fila_teste] is novo
+    assert executor._STATS[fila_teste]["falhas"] == 1
+
+
+def test_encerrar_nao_espera_tarefa_longa(fila_teste, monkeypatch):
+    monkeypatch.setattr(executor, "_POOLS", {})
+
+    async def cenario():
+        fut = asyncio.ensure_future(executor.executar(fila_teste, time.sleep, 60))
+        await asyncio.sleep(1.0)
+
+        inicio = time.monotonic()
+        executor.encerrar()
+        assert time.monotonic() - inicio < 10
+
+        with pytest.raises(BrokenProcessPool):
+            await fut
+
+    asyncio.run(cenario())
+
+
+def test_aquecer_nao_propaga_erro(monkeypatch, capsys):
+    def falha():
+        raise RuntimeError("modelo corrompido")
+
+    # exceção no initializer quebraria o pool (BrokenProcessPool em toda tarefa)
+    monkeypatch.setattr(team_generator, "_carregar_jogadores", falha)
+    team_generator.aquecer()
+
+    assert "modelo corrompido" in capsys.readouterr().out
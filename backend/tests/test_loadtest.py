@@ -0,0 +1,73 @@
+import multiprocessing
+import os
+import random
+import time
+from types import SimpleNamespace
+
+from loadtest import run
+
+
+def test_percentil_nearest_rank():
+    valores = [float(v) for v in range(1, 101)]
+    random.Random(0).shuffle(valores)
+
+    assert run._percentil([], 95) == 0.0
+    assert run._percentil([7.0], 99) == 7.0
+    assert run._percentil(valores, 50) == 50.0
+    assert run._percentil(valores, 95) == 95.0
+    assert run._percentil(valores, 99) == 99.0
+    assert run._percentil(valores, 100) == 100.0
+    # nearest-rank: sempre um valor observado, nunca interpolado
+    assert run._percentil([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+
+
+def _relatorio(p95, p99, rps):
+    return {"endpoints": {"gerar-time": {"p95_ms": p95, "p99_ms": p99, "throughput_rps": rps}}}
+
+
+def test_comparar_baseline():
+    base = _relatorio(100.0, 200.0, 50.0)
+
+    assert run.comparar_baseline(_relatorio(115.0, 230.0, 42.0), base, 0.2) == []
+
+    regressoes = run.comparar_baseline(_relatorio(130.0, 200.0, 30.0), base, 0.2)
+    assert len(regressoes) == 2
+    assert regressoes[0].startswith("gerar-time.p95_ms")
+    assert regressoes[1].startswith("gerar-time.throughput_rps")
+
+    # endpoint novo no relatório atual ou métrica zerada na baseline não contam
+    atual = _relatorio(500.0, 500.0, 1.0)
+    atual["endpoints"]["backtest"] = {"p95_ms": 9999.0}
+    assert run.comparar_baseline(atual, _relatorio(0.0, 0.0, 0.0), 0.2) == []
+
+
+def test_gerar_hit_repete_pares_quentes():
+    args = SimpleNamespace(formacoes=run.FORMACOES, orcamentos=None, top_n=5, backtest_hit=0.8, gerar_hit=1.0)
+    rnd = random.Random(1)
+
+    for _ in range(50):
+        _, _, _, kw = run._sortear_requisicao(args, {"gerar-time": 1.0}, rnd)
+        assert (kw["json"]["cartoletas"], kw["json"]["formacao"]) in run.GERAR_QUENTES
+
+    args.gerar_hit = 0.0
+    pares = {
+        (kw["json"]["cartoletas"], kw["json"]["formacao"])
+        for _, _, _, kw in (run._sortear_requisicao(args, {"gerar-time": 1.0}, rnd) for _ in range(50))
+    }
+    assert not pares & set(run.GERAR_QUENTES)
+
+
+def test_rss_so_workers_de_spawn():
+    ctx = multiprocessing.get_context("spawn")
+    worker = ctx.Process(target=time.sleep, args=(5,))
+    worker.start()
+    try:
+        # logo após o start o cmdline ainda pode estar vazio (exec em andamento)
+        limite = time.monotonic() + 10
+        while not run._eh_worker_pool(worker.pid) and time.monotonic() < limite:
+            time.sleep(0.05)
+        assert run._eh_worker_pool(worker.pid)
+        assert not run._eh_worker_pool(os.getpid())
+    finally:
+        worker.terminate()
+        worker.join()
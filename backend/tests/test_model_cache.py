@@ -0,0 +1,128 @@
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from app.ml import model_cache
+
+
+class _ModeloFake:
+    fits = 0
+
+    def fit(self, X, y):
+        _ModeloFake.fits += 1
+        # ~400KB aleatórios: não comprimem, cada arquivo tem tamanho previsível
+        self.coef_ = np.random.default_rng(len(X)).random(50_000)
+        self.n_ = float(len(X))
+        return self
+
+
+X = pd.DataFrame({"media_5": [1.0, 2.0, 3.0], "preco": [5.0, 6.0, 7.0]})
+y = pd.Series([1.0, 2.0, 3.0])
+PARAMS = {"n_estimators": 10}
+
+
+def test_cache_reaproveita_independente_da_ordem(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_cache, "CACHE_PATH", tmp_path)
+    _ModeloFake.fits = 0
+
+    model_cache.get_or_fit(_ModeloFake, X, y, PARAMS, (2025, 10))
+    # mesmas linhas em outra ordem -> mesma chave, sem novo fit
+    m = model_cache.get_or_fit(_ModeloFake, X.iloc[::-1], y.iloc[::-1], PARAMS, (2025, 10))
+    assert _ModeloFake.fits == 1
+    assert m.n_ == 3.0
+
+    # janela diferente -> novo modelo
+    model_cache.get_or_fit(_ModeloFake, X, y, PARAMS, (2025, 11))
+    assert _ModeloFake.fits == 2
+
+
+def test_ordem_canonica_gera_o_mesmo_modelo(tmp_path, monkeypatch):
+    # o bootstrap da floresta depende da ordem das linhas: sem ordem canônica,
+    # a mesma chave poderia corresponder a modelos diferentes
+    rng = np.random.default_rng(0)
+    Xr = pd.DataFrame(rng.normal(size=(200, 3)), columns=["media_5", "std_5", "preco"])
+    yr = pd.Series(rng.normal(size=200))
+    embaralhado = rng.permutation(200)
+
+    def modelo():
+        return RandomForestRegressor(n_estimators=5, random_state=42)
+
+    preds = []
+    for i, (Xi, yi) in enumerate([(Xr, yr), (Xr.iloc[embaralhado], yr.iloc[embaralhado])]):
+        monkeypatch.setattr(model_cache, "CACHE_PATH", tmp_path / str(i))
+        preds.append(model_cache.get_or_fit(modelo, Xi, yi, {"n_estimators": 5}, (2025, 1)).predict(Xr))
+
+    np.testing.assert_array_equal(preds[0], preds[1])
+
+
+def test_falha_no_utime_nao_apaga_modelo(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_cache, "CACHE_PATH", tmp_path)
+    _ModeloFake.fits = 0
+    model_cache.get_or_fit(_ModeloFake, X, y, PARAMS, (2025, 10))
+
+    def utime_falha(*args, **kwargs):
+        raise PermissionError("somente leitura")
+
+    monkeypatch.setattr(model_cache.os, "utime", utime_falha)
+    model_cache.get_or_fit(_ModeloFake, X, y, PARAMS, (2025, 10))
+
+    assert _ModeloFake.fits == 1
+    assert len(list(tmp_path.rglob("*.joblib"))) == 1
+
+
+def test_varredura_sequencial_nao_zera_acertos(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_cache, "CACHE_PATH", tmp_path)
+    # cabem 3 modelos de ~400KB; o backtest varre 5 janelas a cada execução
+    monkeypatch.setattr(model_cache, "MAX_MB", 1.3)
+    janelas = [(2025, r) for r in range(1, 6)]
+
+    fits_por_varredura = []
+    for _ in range(3):
+        _ModeloFake.fits = 0
+        for janela in janelas:
+            model_cache.get_or_fit(_ModeloFake, X, y, PARAMS, janela)
+        fits_por_varredura.append(_ModeloFake.fits)
+
+    # LRU puro retreinaria as 5 em toda varredura; aqui 2 ficam no principal
+    # e a vaga da entrada gira entre as demais
+    assert fits_por_varredura == [5, 3, 3]
+    assert len(list(tmp_path.rglob("*.joblib"))) == 3
+    assert sum(os.path.getsize(p) for p in tmp_path.rglob("*.joblib")) <= 1.3 * 1024 * 1024
+
+
+def test_janela_nova_entra_com_cache_cheio(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_cache, "CACHE_PATH", tmp_path)
+    monkeypatch.setattr(model_cache, "MAX_MB", 1.3)
+
+    # cache cheio com janelas já muito acessadas
+    for _ in range(10):
+        for r in range(1, 4):
+            model_cache.get_or_fit(_ModeloFake, X, y, PARAMS, (2025, r))
+
+    # rodada nova: o backtest incremental treina a janela 4 e o train_real pede de novo
+    _ModeloFake.fits = 0
+    for r in range(1, 5):
+        model_cache.get_or_fit(_ModeloFake, X, y, PARAMS, (2025, r))
+    model_cache.get_or_fit(_ModeloFake, X, y, PARAMS, (2025, 4))
+    assert _ModeloFake.fits == 1
+
+    # com o horizonte andando, a janela nova chega ao principal e tudo volta a ser acerto
+    for _ in range(3):
+        for r in range(2, 5):
+            model_cache.get_or_fit(_ModeloFake, X, y, PARAMS, (2025, r))
+    _ModeloFake.fits = 0
+    for r in range(2, 5):
+        model_cache.get_or_fit(_ModeloFake, X, y, PARAMS, (2025, r))
+    assert _ModeloFake.fits == 0
+
+
+def test_acessos_nao_cresce_sem_limite(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_cache, "CACHE_PATH", tmp_path)
+    monkeypatch.setattr(model_cache, "AMOSTRA", 16)
+
+    for r in range(100):
+        model_cache.get_or_fit(_ModeloFake, X, y, PARAMS, (2025, r))
+
+    assert len(model_cache._ler_acessos()) <= 16
@@ -1,2 +1,126 @@
+import random
+from types import SimpleNamespace
+
+import pandas as pd
+import pulp
+import pytest
+
+from app.optimizer import kbest
+from app.optimizer.budget_index import build_budget_index, carregar_indices, lookup_titulares, salvar_indices
+from app.optimizer.optimizer import (
+    OrcamentoInsuficiente, custo_minimo, ensure_pos, montar_problema, montar_titulares, montar_top_n,
+)
+from app.services import team_generator
+
 def test_formacao():
     assert True
+
+def _jogadores_sinteticos(seed=7, por_posicao=12, arredondar=True):
+    rnd = random.Random(seed)
+    rows = []
+    for posicao_id in [1, 2, 3, 4, 5]:
+        for _ in range(por_posicao):
+            preco, pred = rnd.uniform(2, 20), rnd.uniform(0, 10)
+            rows.append({
+                "atleta_id": len(rows) + 1,
+                "posicao_id": posicao_id,
+                "preco": round(preco, 2) if arredondar else preco,
+                "pred": round(pred, 2) if arredondar else pred,
+            })
+    return pd.DataFrame(rows)
+
+def _top_n_mip(jogadores, cartoletas, formacao, n, min_diferenca):
+    # referência: MIP completo (sem poda) resolvido n vezes com cortes no-good
+    jogadores = ensure_pos(jogadores)
+    prob, x, idx = montar_problema(jogadores, cartoletas, formacao)
+    pontos = []
+    for _ in range(n):
+        prob.solve(pulp.PULP_CBC_CMD(msg=False))
+        if pulp.LpStatus[prob.status] != "Optimal":
+            break
+        chosen_idx = [i for i in idx if (x[i].value() or 0) > 0.5]
+        pontos.append(float(jogadores.loc[chosen_idx, "pred"].sum()))
+        prob += pulp.lpSum(x[i] for i in chosen_idx) <= 11 - min_diferenca
+    return pontos
+
+def test_top_n_ordenado_e_distinto():
+    jogadores = _jogadores_sinteticos()
+    times = montar_top_n(jogadores, 100.0, "4-3-3", n=5, min_diferenca=2)
+
+    assert len(times) == 5
+    pontos = [round(float(t["pred"].sum()), 6) for t in times]
+    assert pontos == sorted(pontos, reverse=True)
+
+    melhor = montar_titulares(jogadores, 100.0, "4-3-3")
+    assert pontos[0] == round(float(melhor["pred"].sum()), 6)
+
+    ids = [set(t["atleta_id"]) for t in times]
+    for a in range(len(ids)):
+        for b in range(a + 1, len(ids)):
+            assert len(ids[a] - ids[b]) >= 2
+
+@pytest.mark.parametrize("seed,formacao,cartoletas,min_diferenca", [
+    (1, "4-3-3", 70.0, 1),
+    (2, "3-5-2", 100.0, 1),
+    (3, "4-4-2", 140.0, 3),
+    (4, "5-3-2", 80.0, 2),
+])
+def test_top_n_igual_ao_mip(seed, formacao, cartoletas, min_diferenca):
+    # sem arredondar não há empates, então a sequência gulosa é única
+    jogadores = _jogadores_sinteticos(seed, por_posicao=25, arredondar=False)
+
+    times = montar_top_n(jogadores, cartoletas, formacao, n=10, min_diferenca=min_diferenca)
+    esperado = _top_n_mip(jogadores, cartoletas, formacao, 10, min_diferenca)
+
+    assert [float(t["pred"].sum()) for t in times] == pytest.approx(esperado, abs=1e-6)
+
+def test_top_n_completa_no_mip_quando_estoura_limite(monkeypatch):
+    jogadores = _jogadores_sinteticos(5, por_posicao=25, arredondar=False)
+    esperado = _top_n_mip(jogadores, 90.0, "4-3-3", 8, 3)
+
+    # com este limite a enumeração entrega só um prefixo e o MIP completa o resto
+    monkeypatch.setattr(kbest, "LIMITE_COMBINACOES", 500)
+    times = montar_top_n(jogadores, 90.0, "4-3-3", n=8, min_diferenca=3)
+
+    assert [float(t["pred"].sum()) for t in times] == pytest.approx(esperado, abs=1e-6)
+
+def test_top_n_orcamento_insuficiente():
+    jogadores = _jogadores_sinteticos()
+    assert montar_top_n(jogadores, 10.0, "4-3-3", n=3) == []
+
+def test_indice_orcamento_igual_ao_solver(tmp_path):
+    jogadores = _jogadores_sinteticos()
+    index = build_budget_index(jogadores, "3-5-2", cartoletas_max=150.0)
+
+    # ida e volta pelo JSON que os workers carregam
+    path = str(tmp_path / "indice.json")
+    salvar_indices(path, "abc", {"3-5-2": index})
+    assinatura, indices = carregar_indices(path)
+    assert assinatura == "abc"
+    index = indices["3-5-2"]
+
+    assert index["custos"] == sorted(index["custos"])
+    assert index["custos"][0] == custo_minimo(jogadores, "3-5-2")
+    for cartoletas in [index["custos"][0], 60.0, 87.5, 150.0]:
+        esperado = montar_titulares(jogadores, cartoletas, "3-5-2")
+        obtido = lookup_titulares(index, jogadores, cartoletas)
+        assert len(obtido) == 11
+        assert round(float(obtido["pred"].sum()), 6) == round(float(esperado["pred"].sum()), 6)
+
+    with pytest.raises(OrcamentoInsuficiente) as exc:
+        lookup_titulares(index, jogadores, index["custos"][0] - 0.01)
+    assert exc.value.custo_minimo == index["custos"][0]
+
+def test_gerar_time_sem_indice_orcamento_insuficiente(monkeypatch):
+    jogadores = _jogadores_sinteticos()
+    monkeypatch.setattr(team_generator, "_carregar_jogadores", lambda: jogadores)
+    monkeypatch.setattr(team_generator, "_indice", lambda formacao: None)
+
+    # sem índice cai no MIP direto; inviável não pode virar escalação parcial
+    req = SimpleNamespace(cartoletas=10.0, formacao="4-3-3")
+    with pytest.raises(OrcamentoInsuficiente) as exc:
+        team_generator.gerar_time(req)
+    assert exc.value.custo_minimo == custo_minimo(jogadores, "4-3-3")
+
+    req.cartoletas = 150.0
+    assert len(team_generator.gerar_time(req)["titulares"]) == 11